@@ -34,10 +34,12 @@
 import time
 from typing import List
 
+from adi import jesd204_fsm
 from adi.ad9081_mc import QuadMxFE
+from adi.calibration import hmc7044_calibration
 
 
-class QuadMxFE_multi(object):
+class QuadMxFE_multi(hmc7044_calibration):
     """ADQUADMXFExEBZ Multi-SOM Manager
 
     parameters:
@@ -50,6 +52,10 @@ class QuadMxFE_multi(object):
             JESD object associated with primary ADQUADMXFExEBZ
         secondary_jesds: type=list[adi.jesd]
             JESD object(s) associated with secondary ADQUADMXFExEBZ(s)
+        calibration: type=boolean
+            Reuse HMC7044 capacitor bank selections and clock output delays
+            stored by an earlier bring-up of the same SOMs, and store them
+            after a full calibration
     """
 
     __rx_buffer_size_multi = 2 ** 14
@@ -61,6 +67,7 @@ class QuadMxFE_multi(object):
         secondary_uris=[],
         primary_jesd=None,
         secondary_jesds=[None],
+        calibration=False,
     ):
 
         if not isinstance(secondary_uris, list):
@@ -71,6 +78,8 @@ class QuadMxFE_multi(object):
         self._dma_show_arming = False
         self._jesd_show_status = False
         self._jesd_fsm_show_status = False
+        self.jesd204_fsm_timeout = 60.0
+        self.jesd204_fsm_timeline = {}
         self._clk_chip_show_cap_bank_sel = False
         self._resync_tx = False
         self._rx_initialized = False
@@ -87,6 +96,10 @@ class QuadMxFE_multi(object):
 
         self.primary._clock_chip_ext = self.primary._ctx.find_device("hmc7044-ext")
 
+        chips = [dev._clock_chip for dev in [self.primary] + self.secondaries]
+        chips.append(self.primary._clock_chip_ext)
+        hmc7044_calibration.__init__(self, calibration, chips)
+
     def reinitialize(self):
         """ reinitialize: reinitialize all transceivers """
         for dev in self.secondaries + [self.primary]:
@@ -132,67 +145,15 @@ class QuadMxFE_multi(object):
         self.__read_jesd_status_all_devs("Initial Lane Alignment Sequence", True)
         self.__read_jesd_status_all_devs("Initial Frame Synchronization", True)
 
-    def _device_is_running(self, dev, index, verbose):
-        err = dev.jesd204_fsm_error
-        paused = dev.jesd204_fsm_paused
-        state = dev.jesd204_fsm_state
-
-        if verbose:
-            print(
-                "%s: DEVICE%d: Is <%s> in state <%s> with status <%d>"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-
-        if err:
-            print(
-                "\nERROR %s: DEVICE%d: Is <%s> in state <%s> with status <%d>\n"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-            return "error"
-
-        state_last = state == "opt_post_running_stage"
-
-        if (state_last == 0) and (paused == 0):
-            return "running"
-
-        if (state_last == 0) and (paused == 1):
-            return "paused"
-
-        if (state_last == 1) and (paused == 0):
-            return "done"
-
-        assert False
-
-    def __jesd204_fsm_is_done(self):
-        cnt = 0
-        for index, dev in enumerate([self.primary] + self.secondaries):
-            ret = self._device_is_running(dev, index, 0)
-
-            if ret == "done":
-                cnt += 1
-
-        if cnt == len([self.primary] + self.secondaries):
-            return "done"
-
     def _jesd204_fsm_sync(self):
-        while True:
-            stat = self.__jesd204_fsm_is_done()
-            if stat == "done":
-                return "done"
-
-            for index, dev in enumerate(self.secondaries + [self.primary]):
-                ret = self._device_is_running(dev, index, self._jesd_fsm_show_status)
-                if index == 0:
-                    statep = dev.jesd204_fsm_state
-                else:
-                    state = dev.jesd204_fsm_state
-                    assert state == statep
-
-                if ret == "paused":
-                    dev.jesd204_fsm_resume = "1"
-
-                if ret == "error":
-                    return ret
+        devs = [self.primary] + self.secondaries
+        self.jesd204_fsm_timeline = {}
+        return jesd204_fsm.sync(
+            devs,
+            self.jesd204_fsm_timeline,
+            timeout=self.jesd204_fsm_timeout,
+            verbose=self._jesd_fsm_show_status,
+        )
 
     def __unsync(self):
         for dev in [self.primary] + self.secondaries:
@@ -205,27 +166,6 @@ class QuadMxFE_multi(object):
         for dev in [self.primary] + self.secondaries:
             dev._clock_chip.attrs["sleep_request"].value = "0"
 
-    def hmc7044_cap_sel(self):
-        vals = []
-        for dev in [self.primary] + self.secondaries:
-            vals.append(dev._clock_chip.reg_read(0x8C))
-
-        vals.append(self.primary._clock_chip_ext.reg_read(0x8C))
-        return vals
-
-    def hmc7044_set_cap_sel(self, vals):
-        """hmc7044_set_cap_sel:
-
-        parameters:
-            vals: type=list
-                Forces certain Capacitor bank selections.
-                Typically the list returned form hmc7044_cap_sel
-        """
-        for dev in [self.primary] + self.secondaries:
-            dev._clock_chip.reg_write(0xB2, vals.pop(0) << 2 | 1)
-
-        self.primary._clock_chip_ext.reg_write(0xB2, vals.pop(0) << 2 | 1)
-
     def hmc7044_ext_output_delay(self, chan, digital, analog_ps):
         """hmc7044_ext_output_delay:
 
@@ -249,6 +189,7 @@ class QuadMxFE_multi(object):
         self.primary._clock_chip_ext.reg_write(0xCF + offs, enable)
         self.primary._clock_chip_ext.reg_write(0xCB + offs, int(val) & 0x1F)
         self.primary._clock_chip_ext.reg_write(0xCC + offs, int(digital) & 0x1F)
+        self._output_delays["ext:%d" % chan] = [digital, analog_ps]
 
     def hmc7044_car_output_delay(self, chan, digital, analog_ps):
         """hmc7044_car_output_delay:
@@ -275,6 +216,7 @@ class QuadMxFE_multi(object):
             dev._clock_chip.reg_write(0xCF + offs, enable)
             dev._clock_chip.reg_write(0xCB + offs, int(val) & 0x1F)
             dev._clock_chip.reg_write(0xCC + offs, int(digital) & 0x1F)
+        self._output_delays["car:%d" % chan] = [digital, analog_ps]
 
     def __rx_dma_arm(self):
         for dev in self.secondaries + [self.primary]:
@@ -300,19 +242,23 @@ class QuadMxFE_multi(object):
         else:
             self.samples_secondary = dev.rx()
 
+    def __sync_links(self):
+        for dev in [self.primary] + self.secondaries:
+            dev.jesd204_fsm_ctrl = 0
+
+        self.__unsync()
+
+        for dev in [self.primary] + self.secondaries:
+            dev.jesd204_fsm_ctrl = 1
+
+        return self._jesd204_fsm_sync()
+
     def _pre_rx_setup(self):
+        state = self._calibration_restore() if self.calibration else None
         retries = 10
         for _ in range(retries):
             try:
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 0
-
-                self.__unsync()
-
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 1
-
-                self._jesd204_fsm_sync()
+                synced, state = self._calibration_sync(self.__sync_links, state)
 
                 if not self._resync_tx:
                     self.__dds_sync_enable(1)
@@ -327,8 +273,12 @@ class QuadMxFE_multi(object):
                 for dev in [self.primary] + self.secondaries:
                     dev.rx_destroy_buffer()
                     dev._rx_init_channels()
+
+                if self.calibration and not state and synced == "done":
+                    self._calibration_save()
                 return
             except:  # noqa: E722
+                state = self._calibration_failed(state)
                 print("Re-initializing due to lock-up")
                 self.reinitialize()
         raise Exception("Unable to initialize (Board reboot required)")
@@ -31,102 +31,158 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from adi.ad469x import ad469x
-from adi.ad717x import ad717x
-from adi.ad719x import ad719x
-from adi.ad777x import ad777x
-from adi.ad936x import Pluto, ad9361, ad9363, ad9364
-from adi.ad4020 import ad4020
-from adi.ad4110 import ad4110
-from adi.ad4130 import ad4130
-from adi.ad4630 import ad4630
-from adi.ad5592r import ad5592r
-from adi.ad5686 import ad5686
-from adi.ad5940 import ad5940
-from adi.ad6676 import ad6676
-from adi.ad7124 import ad7124
-from adi.ad7291 import ad7291
-from adi.ad7606 import ad7606
-from adi.ad7689 import ad7689
-from adi.ad7746 import ad7746
-from adi.ad7768 import ad7768
-from adi.ad7799 import ad7799
-from adi.ad9081 import ad9081
-from adi.ad9081_mc import QuadMxFE, ad9081_mc
-from adi.ad9083 import ad9083
-from adi.ad9094 import ad9094
-from adi.ad9136 import ad9136
-from adi.ad9144 import ad9144
-from adi.ad9152 import ad9152
-from adi.ad9162 import ad9162
-from adi.ad9166 import ad9166
-from adi.ad9172 import ad9172
-from adi.ad9250 import ad9250
-from adi.ad9265 import ad9265
-from adi.ad9371 import ad9371
-from adi.ad9434 import ad9434
-from adi.ad9467 import ad9467
-from adi.ad9625 import ad9625
-from adi.ad9680 import ad9680
-from adi.ada4961 import ada4961
-from adi.adaq8092 import adaq8092
-from adi.adar1000 import adar1000, adar1000_array
-from adi.adf4159 import adf4159
-from adi.adf4355 import adf4355
-from adi.adf4371 import adf4371
-from adi.adf5610 import adf5610
-from adi.adg2128 import adg2128
-from adi.adis16460 import adis16460
-from adi.adis16495 import adis16495
-from adi.adis16507 import adis16507
-from adi.adl5240 import adl5240
-from adi.adl5960 import adl5960
-from adi.admv8818 import admv8818
-from adi.adpd188 import adpd188
-from adi.adpd410x import adpd410x
-from adi.adpd1080 import adpd1080
-from adi.adrf5720 import adrf5720
-from adi.adrv9002 import adrv9002
-from adi.adrv9009 import adrv9009
-from adi.adrv9009_zu11eg import adrv9009_zu11eg
-from adi.adrv9009_zu11eg_fmcomms8 import adrv9009_zu11eg_fmcomms8
-from adi.adrv9009_zu11eg_multi import adrv9009_zu11eg_multi
-from adi.adt7420 import adt7420
-from adi.adxl313 import adxl313
-from adi.adxl345 import adxl345
-from adi.adxl355 import adxl355
-from adi.adxrs290 import adxrs290
-from adi.cn0511 import cn0511
-from adi.cn0532 import cn0532
-from adi.cn0554 import cn0554
-from adi.cn0579 import cn0579
-from adi.daq2 import DAQ2
-from adi.daq3 import DAQ3
-from adi.fmc_vna import fmcvna
-from adi.fmcadc3 import fmcadc3
-from adi.fmcjesdadc1 import fmcjesdadc1
-from adi.fmclidar1 import fmclidar1
-from adi.fmcomms5 import FMComms5
-from adi.fmcomms11 import FMComms11
-from adi.gen_mux import genmux
-from adi.lm75 import lm75
-from adi.ltc2314_14 import ltc2314_14
-from adi.ltc2387 import ltc2387
-from adi.ltc2499 import ltc2499
-from adi.ltc2688 import ltc2688
-from adi.ltc2983 import ltc2983
-from adi.max9611 import max9611
-from adi.max11205 import max11205
-from adi.max31855 import max31855
-from adi.max31865 import max31865
-from adi.one_bit_adc_dac import one_bit_adc_dac
-from adi.QuadMxFE_multi import QuadMxFE_multi
-from adi.tdd import tdd
-
-try:
-    from adi.jesd import jesd
-except ImportError:
-    pass
+"""Analog Devices hardware interfaces
+
+Driver classes are resolved on first attribute access so that ``import adi``
+stays cheap. Only the module backing a requested class is imported, along
+with its own dependencies (NumPy, pylibiio, paramiko for JESD monitoring).
+"""
+
+import importlib
+import sys
+import types
+
+# Module (relative to adi) -> public names it provides
+_modules = {
+    "ad469x": ("ad469x",),
+    "ad717x": ("ad717x",),
+    "ad719x": ("ad719x",),
+    "ad777x": ("ad777x",),
+    "ad936x": ("Pluto", "ad9361", "ad9363", "ad9364"),
+    "ad4020": ("ad4020",),
+    "ad4110": ("ad4110",),
+    "ad4130": ("ad4130",),
+    "ad4630": ("ad4630",),
+    "ad5592r": ("ad5592r",),
+    "ad5686": ("ad5686",),
+    "ad5940": ("ad5940",),
+    "ad6676": ("ad6676",),
+    "ad7124": ("ad7124",),
+    "ad7291": ("ad7291",),
+    "ad7606": ("ad7606",),
+    "ad7689": ("ad7689",),
+    "ad7746": ("ad7746",),
+    "ad7768": ("ad7768",),
+    "ad7799": ("ad7799",),
+    "ad9081": ("ad9081",),
+    "ad9081_mc": ("QuadMxFE", "ad9081_mc"),
+    "ad9083": ("ad9083",),
+    "ad9094": ("ad9094",),
+    "ad9136": ("ad9136",),
+    "ad9144": ("ad9144",),
+    "ad9152": ("ad9152",),
+    "ad9162": ("ad9162",),
+    "ad9166": ("ad9166",),
+    "ad9172": ("ad9172",),
+    "ad9250": ("ad9250",),
+    "ad9265": ("ad9265",),
+    "ad9371": ("ad9371",),
+    "ad9434": ("ad9434",),
+    "ad9467": ("ad9467",),
+    "ad9625": ("ad9625",),
+    "ad9680": ("ad9680",),
+    "ada4961": ("ada4961",),
+    "adaq8092": ("adaq8092",),
+    "adar1000": ("adar1000", "adar1000_array"),
+    "adf4159": ("adf4159",),
+    "adf4355": ("adf4355",),
+    "adf4371": ("adf4371",),
+    "adf5610": ("adf5610",),
+    "adg2128": ("adg2128",),
+    "adis16460": ("adis16460",),
+    "adis16495": ("adis16495",),
+    "adis16507": ("adis16507",),
+    "adl5240": ("adl5240",),
+    "adl5960": ("adl5960",),
+    "admv8818": ("admv8818",),
+    "adpd188": ("adpd188",),
+    "adpd410x": ("adpd410x",),
+    "adpd1080": ("adpd1080",),
+    "adrf5720": ("adrf5720",),
+    "adrv9002": ("adrv9002",),
+    "adrv9009": ("adrv9009",),
+    "adrv9009_zu11eg": ("adrv9009_zu11eg",),
+    "adrv9009_zu11eg_fmcomms8": ("adrv9009_zu11eg_fmcomms8",),
+    "adrv9009_zu11eg_multi": ("adrv9009_zu11eg_multi",),
+    "adt7420": ("adt7420",),
+    "adxl313": ("adxl313",),
+    "adxl345": ("adxl345",),
+    "adxl355": ("adxl355",),
+    "adxrs290": ("adxrs290",),
+    "cn0511": ("cn0511",),
+    "cn0532": ("cn0532",),
+    "cn0554": ("cn0554",),
+    "cn0579": ("cn0579",),
+    "daq2": ("DAQ2",),
+    "daq3": ("DAQ3",),
+    "fmc_vna": ("fmcvna",),
+    "fmcadc3": ("fmcadc3",),
+    "fmcjesdadc1": ("fmcjesdadc1",),
+    "fmclidar1": ("fmclidar1",),
+    "fmcomms5": ("FMComms5",),
+    "fmcomms11": ("FMComms11",),
+    "gen_mux": ("genmux",),
+    "lm75": ("lm75",),
+    "ltc2314_14": ("ltc2314_14",),
+    "ltc2387": ("ltc2387",),
+    "ltc2499": ("ltc2499",),
+    "ltc2688": ("ltc2688",),
+    "ltc2983": ("ltc2983",),
+    "max9611": ("max9611",),
+    "max11205": ("max11205",),
+    "max31855": ("max31855",),
+    "max31865": ("max31865",),
+    "one_bit_adc_dac": ("one_bit_adc_dac",),
+    "QuadMxFE_multi": ("QuadMxFE_multi",),
+    "tdd": ("tdd",),
+    "jesd": ("jesd",),
+}
+
+_exports = {n: m for m, names in _modules.items() for n in names}
+
+__all__ = sorted(_exports)
 
 __version__ = "0.0.16"
 name = "Analog Devices Hardware Interfaces"
+
+
+def __getattr__(attr):
+    if attr in _exports:
+        module = importlib.import_module("." + _exports[attr], __name__)
+        value = getattr(module, attr)
+    else:
+        try:
+            value = importlib.import_module("." + attr, __name__)
+        except ModuleNotFoundError as ex:
+            if ex.name != __name__ + "." + attr:
+                raise
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {attr!r}"
+            ) from None
+    globals()[attr] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
+
+
+class _lazy_package(types.ModuleType):
+    """Keep driver classes bound over their submodules
+
+    Importing a submodule binds it on the package under its own name, which
+    for most drivers is also the name of the class it provides (adi.ad9081,
+    adi.tdd, ...). Swap in the class so adi.<name> always means the driver.
+    """
+
+    def __setattr__(self, attr, value):
+        if (
+            isinstance(value, types.ModuleType)
+            and attr in _exports
+            and value.__name__ == __name__ + "." + _exports[attr]
+        ):
+            value = getattr(value, attr, value)
+        super().__setattr__(attr, value)
+
+
+sys.modules[__name__].__class__ = _lazy_package
@@ -34,6 +34,7 @@
 from decimal import Decimal
 
 import numpy as np
+from adi import topology as topology_cache
 from adi.attribute import attribute
 from adi.context_manager import context_manager
 from adi.rx_tx import rx
@@ -52,27 +53,45 @@ class ad7124(rx, context_manager):
 
         compatible_parts = ["ad7124-8", "ad7124-4"]
 
-        self._ctrl = None
+        topology = topology_cache.load(self._ctx, "ad7124", device_index)
+        if topology is None or not self.__use_topology(topology):
+            topology = self.__find_topology(compatible_parts, device_index)
+            self.__use_topology(topology)
+            topology_cache.save(self._ctx, "ad7124", topology, device_index)
+
+        for name in topology["channels"]:
+            self._rx_channel_names.append(name)
+            self.channel.append(self._channel(self._ctrl, name))
+        rx.__init__(self)
+
+    def __find_topology(self, compatible_parts, device_index):
+        ctrl = None
         index = 0
 
         # Selecting the device_index-th device from the 7124 family as working device.
         for device in self._ctx.devices:
             if device.name in compatible_parts:
                 if index == device_index:
-                    self._ctrl = device
-                    self._rxadc = device
+                    ctrl = device
                     break
                 else:
                     index += 1
 
         # dynamically get channels and sorting them after the index of the first voltage channel
-        self._ctrl.channels.sort(key=lambda x: int(x.id[7 : x.id.find("-")]))
-
-        for ch in self._ctrl.channels:
-            name = ch._id
-            self._rx_channel_names.append(name)
-            self.channel.append(self._channel(self._ctrl, name))
-        rx.__init__(self)
+        channels = sorted(
+            (ch._id for ch in ctrl.channels), key=lambda x: int(x[7 : x.find("-")])
+        )
+        return {"ctrl": ctrl.id, "channels": channels}
+
+    def __use_topology(self, topology):
+        """Apply a topology, returns False if it does not match the context"""
+        self._ctrl = self._ctx.find_device(topology["ctrl"])
+        self._rxadc = self._ctrl
+        if not self._ctrl:
+            return False
+        if {ch._id for ch in self._ctrl.channels} != set(topology["channels"]):
+            return False
+        return True
 
     def rx(self):
         sig = super().rx()
@@ -35,6 +35,7 @@
 from decimal import Decimal
 
 import numpy as np
+from adi import topology as topology_cache
 from adi.attribute import attribute
 from adi.context_manager import context_manager
 from adi.rx_tx import rx
@@ -75,25 +76,39 @@ class ad717x(rx, context_manager):
             if device_name not in compatible_parts:
                 raise Exception(f"Not a compatible device: {device_name}")
 
+        topology = topology_cache.load(self._ctx, "ad717x", device_name)
+        if topology is None or not self.__use_topology(topology):
+            topology = self.__find_topology(device_name)
+            self.__use_topology(topology)
+            topology_cache.save(self._ctx, "ad717x", topology, device_name)
+
+        for name in topology["channels"]:
+            self._rx_channel_names.append(name)
+            self.channel.append(self._channel(self._ctrl, name))
+
+        rx.__init__(self)
+
+    def __find_topology(self, device_name):
+        ctrl = None
+
         # Select the device matching device_name as working device
         for device in self._ctx.devices:
             if device.name == device_name:
-                self._ctrl = device
-                self._rxadc = device
+                ctrl = device
                 break
 
-        if not self._ctrl:
-            raise Exception("Error in selecting matching device")
-
-        if not self._rxadc:
+        if not ctrl:
             raise Exception("Error in selecting matching device")
 
-        for ch in self._ctrl.channels:
-            name = ch._id
-            self._rx_channel_names.append(name)
-            self.channel.append(self._channel(self._ctrl, name))
+        return {"ctrl": ctrl.id, "channels": [ch._id for ch in ctrl.channels]}
 
-        rx.__init__(self)
+    def __use_topology(self, topology):
+        """Apply a topology, returns False if it does not match the context"""
+        self._ctrl = self._ctx.find_device(topology["ctrl"])
+        self._rxadc = self._ctrl
+        return bool(self._ctrl) and all(
+            self._ctrl.find_channel(name) for name in topology["channels"]
+        )
 
     class _channel(attribute):
 
@@ -33,6 +33,7 @@
 
 from typing import Dict, List
 
+from adi import topology as topology_cache
 from adi.ad9081 import ad9081
 from adi.attribute import attribute
 from adi.context_manager import context_manager
@@ -135,6 +136,21 @@ class ad9081_mc(ad9081):
         self._rx_channel_names: List[str] = []
         context_manager.__init__(self, uri, self._device_name)
 
+        topology = topology_cache.load(self._ctx, "ad9081_mc", phy_dev_name)
+        if topology is None or not self.__use_topology(topology):
+            topology = self.__find_topology(phy_dev_name)
+            self.__use_topology(topology)
+            topology_cache.save(self._ctx, "ad9081_mc", topology, phy_dev_name)
+
+        # Map unique attributes to channel properties
+        self._map_unique(self._path_map)
+
+        # Bring up DMA and DDS interfaces
+        rx_tx.__init__(self)
+        sync_start.__init__(self)
+        self.rx_buffer_size = 2 ** 16
+
+    def __find_topology(self, phy_dev_name):
         if not phy_dev_name:
             # Get ad9081 dev name with most channel attributes
             channel_attr_count = {
@@ -144,18 +160,18 @@ class ad9081_mc(ad9081):
             }
             phy_dev_name = max(channel_attr_count, key=channel_attr_count.get)
 
-        self._ctrl = self._ctx.find_device(phy_dev_name)
-        if not self._ctrl:
+        ctrl = self._ctx.find_device(phy_dev_name)
+        if not ctrl:
             raise Exception("phy_dev_name not found with name: {}".format(phy_dev_name))
 
         # Find device with buffers
-        self._txdac = _find_dev_with_buffers(self._ctx, True, "axi-ad9081")
-        self._rxadc = _find_dev_with_buffers(self._ctx, False, "axi-ad9081")
+        txdac = _find_dev_with_buffers(self._ctx, True, "axi-ad9081")
+        rxadc = _find_dev_with_buffers(self._ctx, False, "axi-ad9081")
 
         # Get DDC and DUC mappings
         # Labels span all devices so they must all be processed
         paths = {}
-        self._default_ctrl_names = []
+        ctrl_names = []
         for dev in self._ctx.devices:
             if dev.name and "ad9081" not in dev.name:
                 continue
@@ -163,35 +179,56 @@ class ad9081_mc(ad9081):
                 not_buffer = False
                 if "label" in ch.attrs:
                     paths, not_buffer = _map_to_dict(paths, ch, dev.name)
-                if not_buffer and dev.name not in self._default_ctrl_names:
-                    self._default_ctrl_names.append(dev.name)
-
-        self._default_ctrl_names = sorted(self._default_ctrl_names)
-        self._ctrls = [self._ctx.find_device(dn) for dn in self._default_ctrl_names]
-        self._path_map = paths
+                if not_buffer and dev.name not in ctrl_names:
+                    ctrl_names.append(dev.name)
 
         # Get data + DDS channels
-        for ch in self._rxadc.channels:
+        rx_channel_names = []
+        tx_channel_names = []
+        dds_channel_names = []
+        for ch in rxadc.channels:
             if ch.scan_element and not ch.output:
-                self._rx_channel_names.append(ch._id)
-        for ch in self._txdac.channels:
+                rx_channel_names.append(ch._id)
+        for ch in txdac.channels:
             if ch.scan_element:
-                self._tx_channel_names.append(ch._id)
+                tx_channel_names.append(ch._id)
             else:
-                self._dds_channel_names.append(ch._id)
+                dds_channel_names.append(ch._id)
 
-        # Sort channel names
-        self._rx_channel_names = _sortconv(self._rx_channel_names)
-        self._tx_channel_names = _sortconv(self._tx_channel_names)
-        self._dds_channel_names = _sortconv(self._dds_channel_names, dds=True)
-
-        # Map unique attributes to channel properties
-        self._map_unique(paths)
+        # Channel names are stored sorted
+        return {
+            "ctrl": ctrl.id,
+            "rxadc": rxadc.id,
+            "txdac": txdac.id,
+            "ctrl_names": sorted(ctrl_names),
+            "paths": paths,
+            "rx": _sortconv(rx_channel_names),
+            "tx": _sortconv(tx_channel_names),
+            "dds": _sortconv(dds_channel_names, dds=True),
+        }
 
-        # Bring up DMA and DDS interfaces
-        rx_tx.__init__(self)
-        sync_start.__init__(self)
-        self.rx_buffer_size = 2 ** 16
+    def __use_topology(self, topology):
+        """Apply a topology, returns False if it does not match the context"""
+        devs = [
+            self._ctx.find_device(name)
+            for name in [topology["ctrl"], topology["rxadc"], topology["txdac"]]
+            + topology["ctrl_names"]
+        ]
+        if not all(devs):
+            return False
+        rxadc, txdac = devs[1:3]
+        if not all(rxadc.find_channel(name) for name in topology["rx"]) or not all(
+            txdac.find_channel(name, True) for name in topology["tx"] + topology["dds"]
+        ):
+            return False
+        self._ctrl, self._rxadc, self._txdac = devs[:3]
+        self._ctrls = devs[3:]
+        self._default_ctrl_names = topology["ctrl_names"]
+        self._path_map = topology["paths"]
+        self._rx_channel_names = topology["rx"]
+        self._tx_channel_names = topology["tx"]
+        self._dds_channel_names = topology["dds"]
+        return True
 
     def _map_unique(self, paths):
         self._rx_fine_ddc_channel_names = {}
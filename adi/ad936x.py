@@ -31,6 +31,7 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from adi.attribute import iio_attr
 from adi.context_manager import context_manager
 from adi.rx_tx import rx_tx_def
 
@@ -47,6 +48,14 @@ class ad9364(rx_tx_def, context_manager):
     _rx_data_device_name = "cf-ad9361-lpc"
     _tx_data_device_name = "cf-ad9361-dds-core-lpc"
     _device_name = ""
+    # The FIR and sample rate sequence in sample_rate must be applied as is
+    _attr_batch_barriers = (
+        "sampling_frequency",
+        "voltage_filter_fir_en",
+        "filter_fir_config",
+    )
+    # Gains are only accepted in manual gain control mode
+    _attr_batch_order = {"gain_control_mode": -1}
 
     @property
     def filter(self):
@@ -72,15 +81,14 @@ class ad9364(rx_tx_def, context_manager):
     def loopback(self, value):
         self._set_iio_debug_attr_str("loopback", value)
 
-    @property
-    def gain_control_mode_chan0(self):
-        """gain_control_mode_chan0: Mode of receive path AGC. Options are:
-        slow_attack, fast_attack, manual"""
-        return self._get_iio_attr_str("voltage0", "gain_control_mode", False)
-
-    @gain_control_mode_chan0.setter
-    def gain_control_mode_chan0(self, value):
-        self._set_iio_attr("voltage0", "gain_control_mode", False, value)
+    gain_control_mode_chan0 = iio_attr(
+        "voltage0",
+        "gain_control_mode",
+        dtype=str,
+        available="gain_control_mode_available",
+        doc="""gain_control_mode_chan0: Mode of receive path AGC. Options are:
+        slow_attack, fast_attack, manual""",
+    )
 
     @property
     def rx_hardwaregain_chan0(self):
@@ -93,32 +101,32 @@ class ad9364(rx_tx_def, context_manager):
         if self.gain_control_mode_chan0 == "manual":
             self._set_iio_attr_float("voltage0", "hardwaregain", False, value)
 
-    @property
-    def tx_hardwaregain_chan0(self):
-        """tx_hardwaregain_chan0: Attenuation applied to TX path"""
-        return self._get_iio_attr("voltage0", "hardwaregain", True)
-
-    @tx_hardwaregain_chan0.setter
-    def tx_hardwaregain_chan0(self, value):
-        self._set_iio_attr_float("voltage0", "hardwaregain", True, value)
-
-    @property
-    def rx_rf_bandwidth(self):
-        """rx_rf_bandwidth: Bandwidth of front-end analog filter of RX path"""
-        return self._get_iio_attr("voltage0", "rf_bandwidth", False)
-
-    @rx_rf_bandwidth.setter
-    def rx_rf_bandwidth(self, value):
-        self._set_iio_attr_int("voltage0", "rf_bandwidth", False, value)
-
-    @property
-    def tx_rf_bandwidth(self):
-        """tx_rf_bandwidth: Bandwidth of front-end analog filter of TX path"""
-        return self._get_iio_attr("voltage0", "rf_bandwidth", True)
-
-    @tx_rf_bandwidth.setter
-    def tx_rf_bandwidth(self, value):
-        self._set_iio_attr_int("voltage0", "rf_bandwidth", True, value)
+    tx_hardwaregain_chan0 = iio_attr(
+        "voltage0",
+        "hardwaregain",
+        True,
+        unit="dB",
+        available="hardwaregain_available",
+        doc="tx_hardwaregain_chan0: Attenuation applied to TX path",
+    )
+
+    rx_rf_bandwidth = iio_attr(
+        "voltage0",
+        "rf_bandwidth",
+        False,
+        int,
+        available="rf_bandwidth_available",
+        doc="rx_rf_bandwidth: Bandwidth of front-end analog filter of RX path",
+    )
+
+    tx_rf_bandwidth = iio_attr(
+        "voltage0",
+        "rf_bandwidth",
+        True,
+        int,
+        available="rf_bandwidth_available",
+        doc="tx_rf_bandwidth: Bandwidth of front-end analog filter of TX path",
+    )
 
     @property
     def sample_rate(self):
@@ -216,23 +224,23 @@ class ad9364(rx_tx_def, context_manager):
             self._set_iio_attr("voltage0", "sampling_frequency", False, rate)
             self._set_iio_attr("out", "voltage_filter_fir_en", False, 1)
 
-    @property
-    def rx_lo(self):
-        """rx_lo: Carrier frequency of RX path"""
-        return self._get_iio_attr("altvoltage0", "frequency", True)
-
-    @rx_lo.setter
-    def rx_lo(self, value):
-        self._set_iio_attr_int("altvoltage0", "frequency", True, value)
-
-    @property
-    def tx_lo(self):
-        """tx_lo: Carrier frequency of TX path"""
-        return self._get_iio_attr("altvoltage1", "frequency", True)
-
-    @tx_lo.setter
-    def tx_lo(self, value):
-        self._set_iio_attr_int("altvoltage1", "frequency", True, value)
+    rx_lo = iio_attr(
+        "altvoltage0",
+        "frequency",
+        True,
+        int,
+        available="frequency_available",
+        doc="rx_lo: Carrier frequency of RX path",
+    )
+
+    tx_lo = iio_attr(
+        "altvoltage1",
+        "frequency",
+        True,
+        int,
+        available="frequency_available",
+        doc="tx_lo: Carrier frequency of TX path",
+    )
 
 
 class ad9361(ad9364):
@@ -241,15 +249,14 @@ class ad9361(ad9364):
     _rx_channel_names = ["voltage0", "voltage1", "voltage2", "voltage3"]
     _tx_channel_names = ["voltage0", "voltage1", "voltage2", "voltage3"]
 
-    @property
-    def gain_control_mode_chan1(self):
-        """gain_control_mode_chan1: Mode of receive path AGC. Options are:
-        slow_attack, fast_attack, manual"""
-        return self._get_iio_attr_str("voltage1", "gain_control_mode", False)
-
-    @gain_control_mode_chan1.setter
-    def gain_control_mode_chan1(self, value):
-        self._set_iio_attr("voltage1", "gain_control_mode", False, value)
+    gain_control_mode_chan1 = iio_attr(
+        "voltage1",
+        "gain_control_mode",
+        dtype=str,
+        available="gain_control_mode_available",
+        doc="""gain_control_mode_chan1: Mode of receive path AGC. Options are:
+        slow_attack, fast_attack, manual""",
+    )
 
     @property
     def rx_hardwaregain_chan1(self):
@@ -262,14 +269,14 @@ class ad9361(ad9364):
         if self.gain_control_mode_chan1 == "manual":
             self._set_iio_attr_float("voltage1", "hardwaregain", False, value)
 
-    @property
-    def tx_hardwaregain_chan1(self):
-        """tx_hardwaregain_chan1: Attenuation applied to TX path"""
-        return self._get_iio_attr("voltage1", "hardwaregain", True)
-
-    @tx_hardwaregain_chan1.setter
-    def tx_hardwaregain_chan1(self, value):
-        self._set_iio_attr_float("voltage1", "hardwaregain", True, value)
+    tx_hardwaregain_chan1 = iio_attr(
+        "voltage1",
+        "hardwaregain",
+        True,
+        unit="dB",
+        available="hardwaregain_available",
+        doc="tx_hardwaregain_chan1: Attenuation applied to TX path",
+    )
 
 
 class ad9363(ad9361):
@@ -33,14 +33,19 @@
 
 import datetime
 import time
+from functools import partial
 from typing import List
 
+import numpy as np
+from adi import jesd204_fsm
 from adi.adrv9009_zu11eg import adrv9009_zu11eg
 from adi.adrv9009_zu11eg_fmcomms8 import adrv9009_zu11eg_fmcomms8
+from adi.calibration import hmc7044_calibration
+from adi.fan_out import fan_out
 from adi.jesd import jesd as jesd_api
 
 
-class adrv9009_zu11eg_multi(object):
+class adrv9009_zu11eg_multi(hmc7044_calibration):
     """ADRV9009-ZU11EG Multi-SOM Manager
 
     parameters:
@@ -55,6 +60,10 @@ class adrv9009_zu11eg_multi(object):
             JESD object(s) associated with secondary ADRV9009-ZU11EG(s)
         fmcomms8: type=boolean
             Boolean flag to idenify is FMComms8(s) are attached to SOMs
+        calibration: type=boolean
+            Reuse HMC7044 capacitor bank selections, framer LMFC offsets and
+            clock output delays stored by an earlier bring-up of the same
+            SOMs, and store them after a full calibration
     """
 
     __rx_buffer_size_multi = 2 ** 14
@@ -67,6 +76,7 @@ class adrv9009_zu11eg_multi(object):
         primary_jesd=None,
         secondary_jesds=[None],
         fmcomms8=False,
+        calibration=False,
     ):
 
         if not jesd_api:
@@ -84,10 +94,13 @@ class adrv9009_zu11eg_multi(object):
         self._dma_show_arming = False
         self._jesd_show_status = False
         self._jesd_fsm_show_status = False
+        self.jesd204_fsm_timeout = 60.0
+        self.jesd204_fsm_timeline = {}
         self._clk_chip_show_cap_bank_sel = False
         self._resync_tx = False
         self._rx_initialized = False
         self._request_sysref_carrier = False
+        self.rx_parallel = False
         self.fmcomms8 = fmcomms8
         if fmcomms8:
             self.primary = adrv9009_zu11eg_fmcomms8(
@@ -115,6 +128,15 @@ class adrv9009_zu11eg_multi(object):
         for dev in self.secondaries + [self.primary]:
             dev._rxadc.set_kernel_buffers_count(1)
 
+        chips = []
+        for dev in [self.primary] + self.secondaries:
+            chips.append(dev._clock_chip)
+            if fmcomms8:
+                chips.append(dev._clock_chip_fmc)
+            chips.append(dev._clock_chip_carrier)
+        chips.append(self.primary._clock_chip_ext)
+        hmc7044_calibration.__init__(self, calibration, chips)
+
     def reinitialize(self):
         """reinitialize: reinitialize all transceivers"""
         for dev in self.secondaries + [self.primary]:
@@ -187,65 +209,15 @@ class adrv9009_zu11eg_multi(object):
                 print("Re-initializing JESD links")
                 time.sleep(10)
 
-    def _device_is_running(self, dev, index, verbose):
-        err = dev.jesd204_fsm_error
-        paused = dev.jesd204_fsm_paused
-        state = dev.jesd204_fsm_state
-
-        if verbose:
-            print(
-                "%s: DEVICE%d: Is <%s> in state <%s> with status <%d>"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-
-        if err:
-            print(
-                "\nERROR %s: DEVICE%d: Is <%s> in state <%s> with status <%d>\n"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-            return "error"
-
-        state_last = state == "opt_post_running_stage"
-
-        if (state_last == 0) and (paused == 0):
-            return "running"
-
-        if (state_last == 0) and (paused == 1):
-            return "paused"
-
-        if (state_last == 1) and (paused == 0):
-            return "done"
-
-        assert False
-
-    def __jesd204_fsm_is_done(self):
-        cnt = 0
-        for index, dev in enumerate([self.primary] + self.secondaries):
-            ret = self._device_is_running(dev, index, 0)
-            if ret == "done":
-                cnt += 1
-
-        if cnt == len([self.primary] + self.secondaries):
-            return "done"
-
     def _jesd204_fsm_sync(self):
-        while True:
-            if self.__jesd204_fsm_is_done() == "done":
-                return "done"
-
-            for index, dev in enumerate(self.secondaries + [self.primary]):
-                ret = self._device_is_running(dev, index, self._jesd_fsm_show_status)
-                if index == 0:
-                    statep = dev.jesd204_fsm_state
-                else:
-                    state = dev.jesd204_fsm_state
-                    assert state == statep
-
-                if ret == "paused":
-                    dev.jesd204_fsm_resume = "1"
-
-                if ret == "error":
-                    return ret
+        devs = [self.primary] + self.secondaries
+        self.jesd204_fsm_timeline = {}
+        return jesd204_fsm.sync(
+            devs,
+            self.jesd204_fsm_timeline,
+            timeout=self.jesd204_fsm_timeout,
+            verbose=self._jesd_fsm_show_status,
+        )
 
     def __unsync(self):
         for dev in [self.primary] + self.secondaries:
@@ -266,33 +238,6 @@ class adrv9009_zu11eg_multi(object):
                 dev._clock_chip_fmc.attrs["sleep_request"].value = "0"
             dev._clock_chip.attrs["sleep_request"].value = "0"
 
-    def hmc7044_cap_sel(self):
-        vals = []
-        for dev in [self.primary] + self.secondaries:
-            vals.append(dev._clock_chip.reg_read(0x8C))
-            if self.fmcomms8:
-                vals.append(dev._clock_chip_fmc.reg_read(0x8C))
-            vals.append(dev._clock_chip_carrier.reg_read(0x8C))
-
-        vals.append(self.primary._clock_chip_ext.reg_read(0x8C))
-        return vals
-
-    def hmc7044_set_cap_sel(self, vals):
-        """hmc7044_set_cap_sel:
-
-        parameters:
-            vals: type=list
-                Forces certain Capacitor bank selections.
-                Typically the list returned form hmc7044_cap_sel
-        """
-        for dev in [self.primary] + self.secondaries:
-            dev._clock_chip.reg_write(0xB2, vals.pop(0) << 2 | 1)
-            if self.fmcomms8:
-                dev._clock_chip_fmc.reg_write(0xB2, vals.pop(0) << 2 | 1)
-            dev._clock_chip_carrier.reg_write(0xB2, vals.pop(0) << 2 | 1)
-
-        self.primary._clock_chip_ext.reg_write(0xB2, vals.pop(0) << 2 | 1)
-
     def hmc7044_ext_output_delay(self, chan, digital, analog_ps):
         """hmc7044_ext_output_delay:
 
@@ -316,6 +261,7 @@ class adrv9009_zu11eg_multi(object):
         self.primary._clock_chip_ext.reg_write(0xCF + offs, enable)
         self.primary._clock_chip_ext.reg_write(0xCB + offs, int(val) & 0x1F)
         self.primary._clock_chip_ext.reg_write(0xCC + offs, int(digital) & 0x1F)
+        self._output_delays["ext:%d" % chan] = [digital, analog_ps]
 
     def hmc7044_car_output_delay(self, chan, digital, analog_ps):
         """hmc7044_car_output_delay:
@@ -338,11 +284,14 @@ class adrv9009_zu11eg_multi(object):
 
         offs = chan * 10
 
-        for dev in [self.primary] + self.secondaries:
+        def write(dev):
             dev._clock_chip_carrier.reg_write(0xCF + offs, enable)
             dev._clock_chip_carrier.reg_write(0xCB + offs, int(val) & 0x1F)
             dev._clock_chip_carrier.reg_write(0xCC + offs, int(digital) & 0x1F)
 
+        self.__fan_out(write, [self.primary] + self.secondaries)
+        self._output_delays["car:%d" % chan] = [digital, analog_ps]
+
     def __rx_dma_arm(self):
         for dev in self.secondaries + [self.primary]:
             if self._dma_show_arming:
@@ -371,32 +320,32 @@ class adrv9009_zu11eg_multi(object):
             freq: type=int
                 Frequency in hertz to be applied to all LOs
         """
-        for dev in self.secondaries + [self.primary]:
-            dev._set_iio_debug_attr_str("adi,trx-pll-lo-frequency_hz", freq, dev._ctrl)
-            dev._set_iio_debug_attr_str(
-                "adi,trx-pll-lo-frequency_hz", freq, dev._ctrl_b
-            )
-            if self.fmcomms8:
-                dev._set_iio_debug_attr_str(
-                    "adi,trx-pll-lo-frequency_hz", freq, dev._ctrl_c
-                )
-                dev._set_iio_debug_attr_str(
-                    "adi,trx-pll-lo-frequency_hz", freq, dev._ctrl_d
-                )
+        self.__fan_out(
+            partial(self.__set_trx_debug_attr, "adi,trx-pll-lo-frequency_hz", freq),
+            self.secondaries + [self.primary],
+        )
 
     def set_trx_framer_a_loopback(self, enable):
         """set_trx_framer_a_loopback: Set bist_framer_a_loopback
         """
-        for dev in self.secondaries + [self.primary]:
-            dev._set_iio_debug_attr_str("bist_framer_a_loopback", enable, dev._ctrl)
-            dev._set_iio_debug_attr_str("bist_framer_a_loopback", enable, dev._ctrl_b)
-            if self.fmcomms8:
-                dev._set_iio_debug_attr_str(
-                    "bist_framer_a_loopback", enable, dev._ctrl_c
-                )
-                dev._set_iio_debug_attr_str(
-                    "bist_framer_a_loopback", enable, dev._ctrl_d
-                )
+        self.__fan_out(
+            partial(self.__set_trx_debug_attr, "bist_framer_a_loopback", enable),
+            self.secondaries + [self.primary],
+        )
+
+    def __trx_ctrls(self, dev):
+        ctrls = [dev._ctrl, dev._ctrl_b]
+        if self.fmcomms8:
+            ctrls += [dev._ctrl_c, dev._ctrl_d]
+        return ctrls
+
+    def __set_trx_debug_attr(self, attr, value, dev):
+        for ctrl in self.__trx_ctrls(dev):
+            dev._set_iio_debug_attr_str(attr, value, ctrl)
+
+    def __fan_out(self, func, devs):
+        """Call func(dev) for each SOM concurrently, one thread per context"""
+        return fan_out([(dev.uri, dev._ctx, partial(func, dev)) for dev in devs])
 
     def __refill_samples(self, dev, is_primary):
         if is_primary:
@@ -404,19 +353,54 @@ class adrv9009_zu11eg_multi(object):
         else:
             self.samples_secondary = dev.rx()
 
+    def __sync_links(self):
+        for dev in [self.primary] + self.secondaries:
+            dev.jesd204_fsm_ctrl = 0
+
+        self.__unsync()
+
+        for dev in [self.primary] + self.secondaries:
+            dev.jesd204_fsm_ctrl = 1
+
+        return self._jesd204_fsm_sync()
+
+    def _calibration_config(self):
+        return {"class": "adrv9009_zu11eg_multi", "fmcomms8": self.fmcomms8}
+
+    def __lmfc_offsets(self, dev):
+        return [
+            dev._get_iio_debug_attr_str("adi,jesd204-framer-a-lmfc-offset", ctrl)
+            for ctrl in self.__trx_ctrls(dev)
+        ]
+
+    def _calibration_values(self):
+        devs = [self.primary] + self.secondaries
+        return {"lmfc_offsets": [self.__lmfc_offsets(dev) for dev in devs]}
+
+    def _calibration_apply(self, values):
+        devs = [self.primary] + self.secondaries
+        offsets = values["lmfc_offsets"]
+        if len(offsets) != len(devs):
+            raise ValueError("LMFC offsets stored for a different number of SOMs")
+        for dev, dev_offsets in zip(devs, offsets):
+            if self.__lmfc_offsets(dev) == dev_offsets:
+                continue
+            ctrls = self.__trx_ctrls(dev)
+            for ctrl, offset in zip(ctrls, dev_offsets):
+                dev._set_iio_debug_attr_str(
+                    "adi,jesd204-framer-a-lmfc-offset", str(offset), ctrl
+                )
+            for ctrl in ctrls:
+                dev._set_iio_debug_attr_str("initialize", "1", ctrl)
+            print("Re-initializing JESD links")
+            time.sleep(10)
+
     def _pre_rx_setup(self):
+        state = self._calibration_restore() if self.calibration else None
         retries = 3
         for _ in range(retries):
             try:
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 0
-
-                self.__unsync()
-
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 1
-
-                self._jesd204_fsm_sync()
+                synced, state = self._calibration_sync(self.__sync_links, state)
 
                 if not self._resync_tx:
                     self.__dds_sync_enable(1)
@@ -431,8 +415,12 @@ class adrv9009_zu11eg_multi(object):
                 for dev in [self.primary] + self.secondaries:
                     dev.rx_destroy_buffer()
                     dev._rx_init_channels()
+
+                if self.calibration and not state and synced == "done":
+                    self._calibration_save()
                 return
             except:  # noqa: E722
+                state = self._calibration_failed(state)
                 print("Re-initializing due to lock-up")
                 self.reinitialize()
         raise Exception("Unable to initialize (Board reboot required)")
@@ -445,10 +433,17 @@ class adrv9009_zu11eg_multi(object):
             An array or list of arrays when more than one receive channel
             is enabled containing samples from a channel or set of channels.
             Data will be complex when using a complex data device.
+            When rx_parallel is set, a single 2-D array of shape
+            (channels, rx_buffer_size) is returned instead, with the
+            channels of the primary followed by those of each secondary.
+            Its type follows rx_complex_format of the primary, which must be
+            complex128 or complex64.
         """
         if not self._rx_initialized:
             self._pre_rx_setup()
             self._rx_initialized = True
+        if self.rx_parallel:
+            return self.__rx_parallel()
         data = []
         self.__rx_dma_arm()
         # Recreate all buffers
@@ -464,3 +459,45 @@ class adrv9009_zu11eg_multi(object):
         for dev in [self.primary] + self.secondaries:
             data += dev.rx()
         return data
+
+    def __rx_arm_buffer(self, dev):
+        if self._dma_show_arming:
+            print("--DMA ARMING--", dev.uri)
+        dev.rx_sync_start = "arm"
+        # Buffers are recreated so the DMA starts on the next SYSREF
+        dev.rx_destroy_buffer()
+        dev._rx_init_channels()
+
+    def __rx_outputs(self, devs):
+        """New stacked output array and a view of its rows for each SOM"""
+        counts = tuple(len(dev.rx_enabled_channels) for dev in devs)
+        fmt = self.primary.rx_complex_format
+        if fmt not in ["complex128", "complex64"]:
+            raise ValueError(
+                f"rx_parallel does not support rx_complex_format {fmt}. "
+                "Use complex128 or complex64"
+            )
+        dtype = np.complex64 if fmt == "complex64" else np.complex128
+        out = np.empty((sum(counts), self.primary.rx_buffer_size), dtype=dtype)
+        bounds = np.cumsum((0,) + counts)
+        return out, [out[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def __rx_parallel(self):
+        """Synchronized capture with buffer setup, refills and conversion of
+        each SOM running concurrently, one worker per context"""
+        devs = [self.primary] + self.secondaries
+        out, views = self.__rx_outputs(devs)
+        self.__fan_out(self.__rx_arm_buffer, devs)
+
+        if self._resync_tx:
+            self.__dds_sync_enable(1)
+
+        self.sysref_request()
+
+        fan_out(
+            [
+                (dev.uri, dev._ctx, partial(dev.rx_into, view))
+                for dev, view in zip(devs, views)
+            ]
+        )
+        return out
@@ -31,11 +31,51 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import asyncio
+import contextlib
+import ctypes
+import functools
+import gzip
+import json
+import math
 import re
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+import iio
+
+from adi import instrumentation
+from adi.fan_out import device_context, fan_out
+
+# One worker per IIO context serializes access to that context while
+# allowing different contexts to be driven concurrently
+_context_workers = weakref.WeakKeyDictionary()
+
+# Writes made through the attribute helpers, counted per device and attribute
+# name, so state derived from attributes can notice writes made through any
+# object sharing the device
+_write_counts = {}
+
+
+_numbers = re.compile(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?")
 
 
 def get_numbers(s):
-    v = re.findall(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?", s)
+    # Fast path for plain integers and floats
+    if "_" not in s:
+        try:
+            return int(s)
+        except ValueError:
+            pass
+        try:
+            v = float(s)
+            if math.isfinite(v):
+                return int(v) if v.is_integer() else v
+        except ValueError:
+            pass
+    v = _numbers.findall(s)
     v = [float(i) for i in v]
     if len(v) == 1:
         v = v[0]
@@ -44,20 +84,722 @@ def get_numbers(s):
     return v
 
 
+def _attr_parser(dtype, unit=None, is_list=False):
+    """Build a parser converting attribute strings to dtype. Plain numbers
+    take a fast path through int() or float(), anything else falls back to
+    get_numbers"""
+    if dtype is str:
+        one = str
+    else:
+
+        def one(s):
+            if unit and s.endswith(unit):
+                s = s[: -len(unit)]
+            try:
+                return bool(int(s)) if dtype is bool else dtype(s)
+            except ValueError:
+                return dtype(get_numbers(s))
+
+    if is_list:
+        return lambda s: [one(v) for v in s.split()]
+    return one
+
+
+def _parse_available(s):
+    """Parse an *_available attribute into a (min, max) range or a list of
+    options"""
+    s = s.strip()
+    if s.startswith("["):
+        v = get_numbers(s)
+        return (v[0], v[-1])
+    return s.split()
+
+
+class iio_attr(object):
+    """Declarative definition of a property backed by an IIO attribute
+
+    Values are converted with a parser selected once from the declared type
+    and written values are checked against the attribute listing available
+    values, which is read once per object. Writes are not checked when the
+    driver does not provide that attribute.
+
+    parameters:
+        channel: type=string
+            Channel name, None for a device attribute
+        name: type=string
+            Attribute name
+        output: type=bool
+            Channel direction
+        dtype: type=type
+            Value type, one of int, float, str or bool
+        unit: type=string
+            Unit suffix stripped from read values, like "dB"
+        is_list: type=bool
+            Values are space separated lists of dtype
+        available: type=string
+            Attribute of the same channel listing valid values or a range
+        readonly: type=bool
+            Property cannot be written
+        device: type=string
+            Member holding the IIO device, defaults to _ctrl
+        doc: type=string
+            Property documentation
+    """
+
+    def __init__(
+        self,
+        channel,
+        name,
+        output=False,
+        dtype=float,
+        unit=None,
+        is_list=False,
+        available=None,
+        readonly=False,
+        device="_ctrl",
+        doc=None,
+    ):
+        self.channel = channel
+        self.name = name
+        self.output = output
+        self.dtype = dtype
+        self.unit = unit
+        self.is_list = is_list
+        self.available = available
+        self.readonly = readonly
+        self.device = device
+        self.__doc__ = doc
+        self.parse = _attr_parser(dtype, unit, is_list)
+
+    def __set_name__(self, owner, name):
+        self.property_name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        dev = getattr(obj, self.device)
+        if self.channel is None:
+            return self.parse(obj._get_iio_dev_attr_str(self.name, dev))
+        return self.parse(
+            obj._get_iio_attr_str(self.channel, self.name, self.output, dev)
+        )
+
+    def __set__(self, obj, value):
+        if self.readonly:
+            raise AttributeError(f"{self.property_name} is read only")
+        values = list(value) if self.is_list else [value]
+        for i, v in enumerate(values):
+            if self.dtype is float and isinstance(v, int):
+                values[i] = v = float(v)
+            if self.dtype is not str and not isinstance(v, self.dtype):
+                article = "an" if self.dtype is int else "a"
+                raise Exception(f"Value must be {article} {self.dtype.__name__}")
+            if self.available:
+                self.validate(obj, v)
+        dev = getattr(obj, self.device)
+        if self.is_list:
+            value = " ".join(str(v) for v in values)
+        else:
+            value = values[0]
+        if self.channel is None:
+            obj._set_iio_dev_attr(self.name, value, dev)
+        else:
+            obj._set_iio_attr(self.channel, self.name, self.output, value, dev)
+
+    def validate(self, obj, value):
+        """ Check a value against the available values of the attribute """
+        cache = obj.__dict__.setdefault("_iio_available", {})
+        key = (self.device, self.channel, self.output, self.available)
+        options = cache.get(key)
+        if options is None:
+            dev = getattr(obj, self.device)
+            try:
+                if self.channel is None:
+                    raw = obj._get_iio_dev_attr_str(self.available, dev)
+                else:
+                    raw = obj._get_iio_attr_str(
+                        self.channel, self.available, self.output, dev
+                    )
+                options = _parse_available(raw)
+            except KeyError:
+                # Older drivers do not list available values, leave the
+                # check to the driver
+                options = False
+            cache[key] = options
+        if options is False:
+            return
+        if isinstance(options, tuple):
+            if not options[0] <= value <= options[1]:
+                raise ValueError(
+                    f"{self.property_name} must be within {list(options)}, got {value}"
+                )
+        elif str(value) not in options and value not in map(get_numbers, options):
+            raise ValueError(
+                f"{self.property_name} must be one of {options}, got {value}"
+            )
+
+
+class attr_cache(object):
+    """Read-through cache of attribute values
+
+    Values are keyed by (device, channel, direction, attribute) and expire
+    after a time to live. Any write through the attribute helpers drops all
+    cached values of the written device, since drivers commonly update
+    related attributes as a side effect of a write.
+
+    parameters:
+        ttl: type=float
+            Seconds a value stays valid. None caches values until the next
+            write
+        ttls: type=dict
+            Time to live per attribute name overriding ttl
+        never_cache: type=list
+            Substrings of attribute or channel names which are always read
+            from hardware. Defaults to volatile values like temperatures,
+            RSSI and raw samples
+    """
+
+    never_cache = ("temp", "rssi", "raw", "input", "processed", "status")
+
+    def __init__(self, ttl=1.0, ttls=None, never_cache=None):
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        if never_cache is not None:
+            self.never_cache = tuple(never_cache)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._volatile = {}
+
+    def _cacheable(self, channel, attr):
+        key = (channel, attr)
+        cacheable = self._volatile.get(key)
+        if cacheable is None:
+            cacheable = not any(
+                pattern in attr or (channel and pattern in channel)
+                for pattern in self.never_cache
+            )
+            self._volatile[key] = cacheable
+        return cacheable
+
+    def get(self, dev, channel, output, attr):
+        """Get a cached value or None when missing, expired or volatile"""
+        if not self._cacheable(channel, attr):
+            return None
+        entry = self._entries.get(dev, {}).get((channel, output, attr))
+        if entry and (entry[1] is None or entry[1] > time.monotonic()):
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def put(self, dev, channel, output, attr, value):
+        """Store a value read from hardware"""
+        if not self._cacheable(channel, attr):
+            return
+        ttl = self.ttls.get(attr, self.ttl)
+        expires = None if ttl is None else time.monotonic() + ttl
+        self._entries.setdefault(dev, {})[(channel, output, attr)] = (value, expires)
+
+    def invalidate(self, dev=None):
+        """Drop cached values of a device, or of all devices"""
+        if dev is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(dev, None)
+
+
+class attr_batch(object):
+    """State of an open attribute write batch
+
+    Holds pending writes keyed by (device, (channel, direction, attribute))
+    in the order they will be flushed, values read during the batch and
+    counters of what happened to the requested writes.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.known = {}
+        self.written = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+
+class restore_report(NamedTuple):
+    """Outcome and phase timings in seconds of a restore"""
+
+    read_time: float  # Reading the live state
+    diff_time: float  # Comparing the live state against the snapshot
+    write_time: float  # Writing attributes which differ
+    written: List[str]  # Attributes written as device/channel/attribute
+    unchanged: int  # Attributes already matching the snapshot
+    failed: List[str]  # Attributes which could not be written
+
+
+# Attributes which are read only or describe live conditions are left out of
+# snapshots
+_snapshot_skip = ("_available", "temp", "rssi", "raw", "input", "processed")
+# Output channels outside of buffers, like DDS tones, hold settings in raw
+_snapshot_skip_output = tuple(p for p in _snapshot_skip if p != "raw")
+
+# Read-all requests return every attribute in one transaction. Buffer size
+# for the response
+_READ_ALL_SIZE = 1 << 20
+
+
+def _read_all_attrs(read, handle, names, buf):
+    """Read all attributes of a device or channel in one transaction
+
+    Uses the libiio convention of passing no attribute name, where each value
+    is returned prefixed by its big endian 32-bit length (negative on error)
+    and padded to four bytes. The response is read into buf, a ctypes
+    string buffer. Returns None when not supported.
+    """
+    try:
+        size = read(handle, None, buf, len(buf))
+    except (OSError, ctypes.ArgumentError):
+        return None
+    raw = buf.raw[:size]
+    values = {}
+    offset = 0
+    for name in names:
+        if offset + 4 > len(raw):
+            return None
+        length = int.from_bytes(raw[offset : offset + 4], "big", signed=True)
+        offset += 4
+        if length < 0:
+            continue
+        values[name] = raw[offset : offset + length].rstrip(b"\0").decode()
+        offset += length + (-length % 4)
+    return values
+
+
+def _read_attrs(attrs, read=None, handle=None, skip=_snapshot_skip, buf=None):
+    """Read attributes of a device or channel, in bulk when possible"""
+    names = [name for name in attrs if not any(p in name for p in skip)]
+    values = None
+    if read and handle is not None and buf is not None and names:
+        values = _read_all_attrs(read, handle, list(attrs), buf)
+    if values is None:
+        values = {}
+        for name in names:
+            try:
+                values[name] = attrs[name].value
+            except OSError:
+                continue
+    return {name: values[name] for name in names if name in values}
+
+
+def _attr_reader(attr, read=None, handle=None):
+    """Callable reading a single attribute value repeatedly. Goes through the
+    libiio read call with a preallocated response buffer when available,
+    instead of allocating one per read like Attr.value"""
+    if not read or handle is None:
+        return lambda: attr.value
+    name = attr.name.encode()
+    buf = ctypes.create_string_buffer(1024)
+    size = len(buf)
+
+    def read_value():
+        read(handle, name, buf, size)
+        return buf.value.decode()
+
+    return read_value
+
+
+def _event_name(channel_name, output, attr_name):
+    if output == "debug":
+        return "debug/" + attr_name
+    if channel_name is None:
+        return attr_name
+    return ("out_" if output else "in_") + channel_name + "/" + attr_name
+
+
+def _as_number(s):
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _same_value(current, value):
+    """Compare attribute strings, numerically when both are plain numbers"""
+    if current == value:
+        return True
+    a, b = _as_number(current), _as_number(value)
+    return a is not None and b is not None and a == b
+
+
+def _device_key(dev):
+    return (id(device_context(dev, dev)), dev.id)
+
+
+def _write_count(devs, names):
+    """Number of writes of the named attributes made to any of the devices
+    through the attribute helpers. Changes on every such write"""
+    keys = {_device_key(dev) for dev in devs if dev}
+    return sum(_write_counts.get((key, name), 0) for key in keys for name in names)
+
+
+def _context_worker(owner):
+    """Get the single thread executor used for async calls on a context"""
+    key = getattr(owner, "_ctx", None) or owner
+    worker = _context_workers.get(key)
+    if not worker:
+        uri = getattr(owner, "uri", "") or ""
+        worker = ThreadPoolExecutor(1, thread_name_prefix="adi-" + uri)
+        _context_workers[key] = worker
+    return worker
+
+
 class attribute:
+    _attr_cache = None
+    _attr_batch = None
+    # Attribute names whose writes are applied immediately and in order while
+    # a batch is open, flushing pending writes first
+    _attr_batch_barriers: tuple = ()
+    # Flush rank per attribute name, lower ranks are written first
+    _attr_batch_order: dict = {}
+
+    @property
+    def attr_cache(self):
+        """attr_cache: Read-through attribute cache of this object, None when
+        disabled"""
+        return self._attr_cache
+
+    def enable_attr_cache(self, ttl=1.0, ttls=None, never_cache=None):
+        """ Cache attribute reads of this object. Writes through this object
+            invalidate the cache of the written device. Changes made outside
+            of it are only seen once values expire
+
+            parameters:
+                ttl: type=float
+                    Seconds a value stays valid. None caches values until the
+                    next write
+                ttls: type=dict
+                    Time to live per attribute name
+                never_cache: type=list
+                    Substrings of attribute or channel names to never cache
+
+            returns: type=attr_cache
+                The cache, which also holds hit and miss counters
+        """
+        self._attr_cache = attr_cache(ttl, ttls, never_cache)
+        return self._attr_cache
+
+    def disable_attr_cache(self):
+        """ Stop caching attribute reads of this object """
+        self._attr_cache = None
+
+    @contextlib.contextmanager
+    def batch(self):
+        """ Collect attribute writes and apply them together on exit
+
+            Writes to the same attribute are coalesced into the last one and
+            writes of values equal to ones already known, from reads during
+            the batch or the attribute cache, are skipped. Pending writes
+            are flushed in request order, adjusted by the per attribute
+            ranks in _attr_batch_order. Reads of pending attributes return
+            the pending value. Writes to attributes in _attr_batch_barriers
+            flush pending writes and are applied immediately. If the block
+            raises, pending writes are discarded.
+
+            returns: type=attr_batch
+                Batch state holding written, coalesced and skipped counters
+        """
+        if self._attr_batch is not None:
+            yield self._attr_batch
+            return
+        self._attr_batch = batch = attr_batch()
+        try:
+            yield batch
+            self.__flush_batch()
+        finally:
+            self._attr_batch = None
+
+    def __flush_batch(self):
+        batch = self._attr_batch
+        order = self._attr_batch_order
+        pending = sorted(batch.pending.items(), key=lambda p: order.get(p[0][1][2], 0))
+        batch.pending = {}
+        cache = self._attr_cache
+        for (dev, key), value in pending:
+            current = batch.known.get((dev, key))
+            if current is None and cache is not None:
+                current = cache.get(dev, *key)
+            if current is not None and _same_value(current, value):
+                batch.skipped += 1
+                continue
+            self.__write_attr_now(dev, key, value)
+
+    @staticmethod
+    def __find_attrs(dev, channel_name, output):
+        if output == "debug":
+            return dev.debug_attrs
+        if channel_name is None:
+            return dev.attrs
+        channel = dev.find_channel(channel_name, output)
+        if not channel:
+            raise Exception("No channel found with name: " + channel_name)
+        return channel.attrs
+
+    def __read_attr(self, dev, channel_name, output, attr_name):
+        """ Read an attribute string through the open batch and the cache """
+        key = (channel_name, output, attr_name)
+        batch = self._attr_batch
+        if batch is not None and (dev, key) in batch.pending:
+            return batch.pending[(dev, key)]
+        cache = self._attr_cache
+        value = None if cache is None else cache.get(dev, *key)
+        if value is None:
+            timed = instrumentation.active
+            if timed:
+                start = instrumentation.clock()
+            value = self.__find_attrs(dev, channel_name, output)[attr_name].value
+            if timed:
+                instrumentation.emit(
+                    "attr_read",
+                    dev.name,
+                    _event_name(channel_name, output, attr_name),
+                    instrumentation.clock() - start,
+                )
+            if cache is not None:
+                cache.put(dev, *key, value)
+        if batch is not None:
+            batch.known[(dev, key)] = value
+        return value
+
+    def __write_attr(self, dev, channel_name, output, attr_name, value):
+        """ Write an attribute string or defer it while a batch is open """
+        key = (channel_name, output, attr_name)
+        batch = self._attr_batch
+        if batch is not None:
+            if attr_name not in self._attr_batch_barriers:
+                if batch.pending.pop((dev, key), None) is not None:
+                    batch.coalesced += 1
+                batch.pending[(dev, key)] = str(value)
+                return
+            self.__flush_batch()
+        self.__write_attr_now(dev, key, str(value))
+
+    def __write_attr_now(self, dev, key, value):
+        channel_name, output, attr_name = key
+        attrs = self.__find_attrs(dev, channel_name, output)
+        if self._attr_cache is not None:
+            self._attr_cache.invalidate(dev)
+        timed = instrumentation.active
+        if timed:
+            start = instrumentation.clock()
+        attrs[attr_name].value = value
+        if timed:
+            instrumentation.emit(
+                "attr_write",
+                dev.name,
+                _event_name(channel_name, output, attr_name),
+                instrumentation.clock() - start,
+            )
+        batch = self._attr_batch
+        if batch is not None:
+            batch.written += 1
+            # Writes can change other attributes of the same device
+            batch.known = {k: v for k, v in batch.known.items() if k[0] is not dev}
+        count = (_device_key(dev), attr_name)
+        _write_counts[count] = _write_counts.get(count, 0) + 1
+
+    async def _run_async(self, func, *args):
+        """ Run a blocking call on the worker of this object's context """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _context_worker(self), functools.partial(func, *args)
+        )
+
+    async def get_attr_async(self, name):
+        """ Get a property of this object without blocking the event loop
+
+            parameters:
+                name: type=string
+                    Name of the property, for example "rx_lo"
+        """
+        return await self._run_async(getattr, self, name)
+
+    async def set_attr_async(self, name, value):
+        """ Set a property of this object without blocking the event loop
+
+            parameters:
+                name: type=string
+                    Name of the property, for example "rx_lo"
+                value:
+                    Value to set
+        """
+        await self._run_async(setattr, self, name, value)
+
+    def _snapshot_devices(self):
+        """ Devices captured by snapshot. By default every device referenced
+            by this object, or all devices of its context when none are
+        """
+        devices = []
+        for value in vars(self).values():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for dev in values:
+                if isinstance(dev, iio.Device) and all(d is not dev for d in devices):
+                    devices.append(dev)
+        if not devices and getattr(self, "_ctx", None):
+            devices = list(self._ctx.devices)
+        keyed = {}
+        for dev in devices:
+            key = dev.name or dev.id
+            n = 1
+            while key in keyed:
+                n += 1
+                key = "{}#{}".format(dev.name or dev.id, n)
+            keyed[key] = dev
+        return keyed
+
+    def __read_state(self, devices):
+        state = {}
+        read_dev = getattr(iio, "_d_read_attr", None)
+        read_chan = getattr(iio, "_c_read_attr", None)
+        # Response buffer shared by all bulk reads of this pass
+        buf = None
+        if read_dev or read_chan:
+            buf = ctypes.create_string_buffer(_READ_ALL_SIZE)
+        for key, dev in devices.items():
+            channels = {}
+            for chan in dev.channels:
+                name = ("out_" if chan.output else "in_") + chan.id
+                if chan.output and not chan.scan_element:
+                    skip = _snapshot_skip_output
+                else:
+                    skip = _snapshot_skip
+                channels[name] = _read_attrs(
+                    chan.attrs, read_chan, getattr(chan, "_channel", None), skip, buf
+                )
+            state[key] = {
+                "attrs": _read_attrs(
+                    dev.attrs, read_dev, getattr(dev, "_device", None), buf=buf
+                ),
+                "channels": channels,
+            }
+        return state
+
+    def snapshot(self, filename=None):
+        """ Capture the configuration of the devices used by this object
+
+            Device and channel attributes are read with a single request per
+            device and channel where supported. Read only and volatile
+            attributes, like available options and temperatures, are left out.
+
+            parameters:
+                filename: type=string
+                    Optional file to save the snapshot to as compact JSON,
+                    gzip compressed when the name ends with .gz
+
+            returns: type=dict
+                The snapshot, which can be passed to restore
+        """
+        snap = {"version": 1, "devices": self.__read_state(self._snapshot_devices())}
+        if filename:
+            opener = gzip.open if str(filename).endswith(".gz") else open
+            with opener(filename, "wt") as f:
+                json.dump(snap, f, separators=(",", ":"))
+        return snap
+
+    def restore(self, snap):
+        """ Restore a configuration captured with snapshot
+
+            The live state is read and only attributes which differ from the
+            snapshot are written, device attributes before channel
+            attributes and ranked by _attr_batch_order. Attributes which
+            cannot be written, or which the live devices do not have, are
+            reported instead of raising.
+
+            parameters:
+                snap: type=dict or string
+                    Snapshot or file name of a saved snapshot
+
+            returns: type=restore_report
+                Attributes written and failed and the time of each phase
+        """
+        if not isinstance(snap, dict):
+            opener = gzip.open if str(snap).endswith(".gz") else open
+            with opener(snap, "rt") as f:
+                snap = json.load(f)
+        if snap.get("version") != 1:
+            raise Exception("Unsupported snapshot version")
+
+        t0 = time.perf_counter()
+        devices = self._snapshot_devices()
+        live = self.__read_state(
+            {k: devices[k] for k in snap["devices"] if k in devices}
+        )
+        t1 = time.perf_counter()
+
+        changes = []
+        unchanged = 0
+        failed = []
+        for key, state in snap["devices"].items():
+            if key not in live:
+                failed.append(key)
+                continue
+            targets = [(None, None, state["attrs"], live[key]["attrs"])]
+            for cname, attrs in state["channels"].items():
+                output, chan_id = cname.split("_", 1)
+                if cname not in live[key]["channels"]:
+                    failed.extend(key + "/" + chan_id + "/" + a for a in attrs)
+                    continue
+                current = live[key]["channels"][cname]
+                targets.append((chan_id, output == "out", attrs, current))
+            for chan_id, output, attrs, current in targets:
+                for attr_name, value in attrs.items():
+                    if attr_name in current and _same_value(current[attr_name], value):
+                        unchanged += 1
+                    else:
+                        changes.append((key, chan_id, output, attr_name, value))
+        t2 = time.perf_counter()
+
+        written = []
+        order = self._attr_batch_order
+        # Device attributes first, then by rank, keeping snapshot order
+        changes.sort(key=lambda c: (c[1] is not None, order.get(c[3], 0)))
+        for key, chan_id, output, attr_name, value in changes:
+            path = "/".join(p for p in (key, chan_id, attr_name) if p)
+            try:
+                self.__write_attr_now(devices[key], (chan_id, output, attr_name), value)
+                written.append(path)
+            except (OSError, KeyError, ValueError):
+                failed.append(path)
+        t3 = time.perf_counter()
+
+        return restore_report(
+            read_time=t1 - t0,
+            diff_time=t2 - t1,
+            write_time=t3 - t2,
+            written=written,
+            unchanged=unchanged,
+            failed=failed,
+        )
+
     def _get_iio_attr_str_multi_dev(self, channel_names, attr_name, output, ctrls):
         """ Get the same channel attribute across multiple devices
             which are assumed to be strings
         """
         if not isinstance(channel_names, list):
             channel_names = [channel_names]
-        return {
-            ctrl.name: [
+
+        def read(ctrl):
+            return [
                 self._get_iio_attr_str(chan_name, attr_name, output, ctrl)
                 for chan_name in channel_names
             ]
-            for ctrl in ctrls
-        }
+
+        ctx = getattr(self, "_ctx", None)
+        results = fan_out(
+            [
+                (k, device_context(ctrl, ctx), functools.partial(read, ctrl))
+                for k, ctrl in enumerate(ctrls)
+            ]
+        )
+        return {ctrl.name: result for ctrl, result in zip(ctrls, results)}
 
     def _set_iio_attr_multi_dev(self, channel_names, attr_name, output, values, ctrls):
         """ Set the same channel attribute across multiple devices
@@ -67,11 +809,22 @@ class attribute:
         """
         if len(values) > len(ctrls) * len(channel_names):
             raise Exception("Too many values to write")
-        i = 0
-        for ctrl in ctrls:
-            for chan_name in channel_names:
-                self._set_iio_attr(chan_name, attr_name, output, values[i], ctrl)
-                i += 1
+
+        def write(ctrl, first):
+            for i, chan_name in enumerate(channel_names):
+                self._set_iio_attr(chan_name, attr_name, output, values[first + i], ctrl)
+
+        ctx = getattr(self, "_ctx", None)
+        fan_out(
+            [
+                (
+                    k,
+                    device_context(ctrl, ctx),
+                    functools.partial(write, ctrl, k * len(channel_names)),
+                )
+                for k, ctrl in enumerate(ctrls)
+            ]
+        )
 
     def _set_iio_attr_float_multi_dev(
         self, channel_names, attr_name, output, values, ctrls
@@ -90,14 +843,7 @@ class attribute:
 
     def _set_iio_attr(self, channel_name, attr_name, output, value, _ctrl=None):
         """ Set channel attribute """
-        if _ctrl:
-            channel = _ctrl.find_channel(channel_name, output)
-        else:
-            channel = self._ctrl.find_channel(channel_name, output)
-        try:
-            channel.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write_attr(_ctrl or self._ctrl, channel_name, output, attr_name, value)
 
     def _set_iio_attr_float(self, channel_name, attr_name, output, value, _ctrl=None):
         """ Set channel attribute with float """
@@ -142,13 +888,7 @@ class attribute:
 
     def _get_iio_attr_str(self, channel_name, attr_name, output, _ctrl=None):
         """ Get channel attribute as string """
-        if _ctrl:
-            channel = _ctrl.find_channel(channel_name, output)
-        else:
-            channel = self._ctrl.find_channel(channel_name, output)
-        if not channel:
-            raise Exception("No channel found with name: " + channel_name)
-        return channel.attrs[attr_name].value
+        return self.__read_attr(_ctrl or self._ctrl, channel_name, output, attr_name)
 
     def _get_iio_attr(self, channel_name, attr_name, output, _ctrl=None):
         """ Get channel attribute as number """
@@ -174,28 +914,15 @@ class attribute:
 
     def _set_iio_dev_attr_str(self, attr_name, value, _ctrl=None):
         """ Set device attribute with string """
-        try:
-            if _ctrl:
-                _ctrl.attrs[attr_name].value = str(value)
-            else:
-                self._ctrl.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write_attr(_ctrl or self._ctrl, None, None, attr_name, value)
 
     def _get_iio_dev_attr_str(self, attr_name, _ctrl=None):
         """ Get device attribute as string """
-        if _ctrl:
-            return _ctrl.attrs[attr_name].value
-        else:
-            return self._ctrl.attrs[attr_name].value
+        return self.__read_attr(_ctrl or self._ctrl, None, None, attr_name)
 
     def _set_iio_dev_attr(self, attr_name, value, _ctrl=None):
         """ Set device attribute """
-        _dev = _ctrl or self._ctrl
-        try:
-            _dev.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write_attr(_ctrl or self._ctrl, None, None, attr_name, value)
 
     def _get_iio_dev_attr(self, attr_name, _ctrl=None):
         """ Set device attribute as number """
@@ -203,20 +930,11 @@ class attribute:
 
     def _set_iio_debug_attr_str(self, attr_name, value, _ctrl=None):
         """ Set debug attribute with string """
-        try:
-            if _ctrl:
-                _ctrl.debug_attrs[attr_name].value = str(value)
-            else:
-                self._ctrl.debug_attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write_attr(_ctrl or self._ctrl, None, "debug", attr_name, value)
 
     def _get_iio_debug_attr_str(self, attr_name, _ctrl=None):
         """ Get debug attribute as string """
-        if _ctrl:
-            return _ctrl.debug_attrs[attr_name].value
-        else:
-            return self._ctrl.debug_attrs[attr_name].value
+        return self.__read_attr(_ctrl or self._ctrl, None, "debug", attr_name)
 
     def _get_iio_debug_attr(self, attr_name, _ctrl=None):
         """ Set debug attribute as number """
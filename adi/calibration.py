@@ -0,0 +1,292 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Persisted calibration of multi-board setups
+
+Bring-up of synchronized multi-SOM systems searches for working HMC7044
+capacitor bank selections and relies on framer LMFC offsets and inter-board
+clock output delays. calibration_store keeps these values on disk, keyed by
+the serial numbers and configuration of the boards, so later bring-ups of the
+same setup can apply them directly and only calibrate from scratch when they
+no longer work. hmc7044_calibration adds this to the multi-SOM managers.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import warnings
+
+from adi import jesd204_fsm, topology
+from adi.discovery import cache_dir
+
+
+def board_id(ctx):
+    """Identity of the board behind a context
+
+    Serial numbers from the context attributes (hw_serial, hw_carrier_serial,
+    ...) together with a hash of the context description, which changes with
+    the firmware and device tree.
+    """
+    attrs = ctx.attrs
+    serials = sorted(
+        f"{name}={value}" for name, value in attrs.items() if name.endswith("serial")
+    )
+    return serials + [topology.context_key(ctx)]
+
+
+class calibration_store(object):
+    """Calibration values on disk, one entry per setup
+
+    parameters:
+        path: type=string
+            JSON file holding the entries. Defaults to calibration.json in
+            the pyadi-iio cache directory
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), "calibration.json")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(ctxs, config):
+        """Key of a setup from the contexts of its boards, in bring-up order,
+        and a JSON serializable description of its configuration"""
+        setup = [config, [board_id(ctx) for ctx in ctxs]]
+        return hashlib.sha1(json.dumps(setup, sort_keys=True).encode()).hexdigest()
+
+    def __read(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def __write(self, entries):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".{}".format(os.getpid())
+            with open(tmp, "w") as f:
+                json.dump(entries, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def load(self, key):
+        """Stored values of a setup, or None"""
+        with self._lock:
+            return self.__read().get(key)
+
+    def save(self, key, values):
+        """Store the values of a setup, replacing earlier ones"""
+        with self._lock:
+            entries = self.__read()
+            entries[key] = values
+            self.__write(entries)
+
+    def remove(self, key):
+        """Drop the values of a setup"""
+        with self._lock:
+            entries = self.__read()
+            if entries.pop(key, None) is not None:
+                self.__write(entries)
+
+
+class hmc7044_calibration(object):
+    """Persisted HMC7044 calibration of a multi-SOM manager
+
+    After a full calibration the capacitor bank selections of all HMC7044s,
+    clock output delays set through hmc7044_*_output_delay and the values
+    returned by _calibration_values are stored. On the next bring-up of the
+    same boards they are first compared against the hardware: when the links
+    already run with them, bring-up is skipped. Otherwise they are applied
+    and validated by the bring-up, falling back to a full calibration when
+    the links do not come up.
+
+    Managers have primary and secondaries SOMs and record output delays in
+    _output_delays.
+
+    parameters:
+        calibration: type=boolean
+            Reuse and store calibration values
+        chips: type=list
+            HMC7044 devices of all SOMs, in the order of hmc7044_cap_sel
+    """
+
+    def __init__(self, calibration, chips):
+        if not chips:
+            raise ValueError("hmc7044_calibration requires the HMC7044 devices")
+        self.calibration = calibration
+        self.calibration_store = calibration_store()
+        self._hmc7044_chips = list(chips)
+        self._output_delays = {}
+        self.__key = None
+
+    def _calibration_config(self):
+        """Configuration stored values depend on, besides the boards"""
+        return {"class": type(self).__name__}
+
+    def _calibration_values(self):
+        """Additional values to store, read from the hardware"""
+        return {}
+
+    def _calibration_apply(self, values):
+        """Write additional values stored with _calibration_values"""
+
+    def hmc7044_cap_sel(self):
+        vals = []
+        for chip in self._hmc7044_chips:
+            vals.append(chip.reg_read(0x8C))
+        return vals
+
+    def hmc7044_set_cap_sel(self, vals):
+        """hmc7044_set_cap_sel:
+
+        parameters:
+            vals: type=list
+                Forces certain Capacitor bank selections.
+                Typically the list returned form hmc7044_cap_sel
+
+        raises: ValueError
+            When vals does not hold one selection per HMC7044
+        """
+        if len(vals) != len(self._hmc7044_chips):
+            raise ValueError(
+                "Expected {} capacitor bank selections, got {}".format(
+                    len(self._hmc7044_chips), len(vals)
+                )
+            )
+        for chip, val in zip(self._hmc7044_chips, vals):
+            chip.reg_write(0xB2, val << 2 | 1)
+
+    def __calibration_key(self):
+        if self.__key is None:
+            devs = [self.primary] + self.secondaries
+            self.__key = self.calibration_store.key(
+                [dev._ctx for dev in devs], self._calibration_config()
+            )
+        return self.__key
+
+    def __links_running(self):
+        devs = [self.primary] + self.secondaries
+        return all(jesd204_fsm.device_status(dev)[0] == "done" for dev in devs)
+
+    def __calibration_current(self, cap_sel, values):
+        """Check whether the links run with the stored values. Only reads
+        registers and attributes"""
+        if not self.__links_running() or self.hmc7044_cap_sel() != cap_sel:
+            return False
+        current = self._calibration_values()
+        return all(values.get(name) == value for name, value in current.items())
+
+    def _calibration_restore(self):
+        """Apply stored calibration values before bring-up
+
+        returns: type=string
+            None when nothing is stored, "running" when the links already
+            run with the stored values, "applied" when they were written and
+            must be validated by bring-up, and "failed" when they could not
+            be applied and were dropped
+        """
+        values = self.calibration_store.load(self.__calibration_key())
+        if values is None:
+            return None
+        try:
+            cap_sel = [int(val) for val in values["cap_sel"]]
+            if len(cap_sel) != len(self._hmc7044_chips):
+                raise ValueError("stored for a different number of HMC7044s")
+            if self.__calibration_current(cap_sel, values):
+                return "running"
+            self._calibration_apply(values)
+            for name, (digital, analog_ps) in values["output_delays"].items():
+                # Delays set explicitly before bring-up take precedence
+                if name in self._output_delays:
+                    continue
+                chip, chan = name.split(":")
+                if chip not in ("ext", "car"):
+                    raise ValueError("unknown output delay " + name)
+                set_delay = getattr(self, "hmc7044_%s_output_delay" % chip)
+                set_delay(int(chan), int(digital), int(analog_ps))
+            self.hmc7044_set_cap_sel(cap_sel)
+        except (OSError, KeyError, TypeError, ValueError) as ex:
+            warnings.warn(
+                "Stored calibration could not be applied ({!r}), recalibrating".format(
+                    ex
+                )
+            )
+            self.calibration_store.remove(self.__calibration_key())
+            return "failed"
+        return "applied"
+
+    def _calibration_reject(self):
+        """Drop the stored values and let the HMC7044s select capacitor banks
+        themselves again"""
+        self.calibration_store.remove(self.__calibration_key())
+        for chip in self._hmc7044_chips:
+            chip.reg_write(0xB2, chip.reg_read(0xB2) & ~1)
+
+    def _calibration_sync(self, sync, state):
+        """Bring up links through sync according to the state returned by
+        _calibration_restore. Stored values which do not give working links
+        are rejected and a full calibration runs instead
+
+        returns: type=tuple
+            Result of the bring-up and the new state
+        """
+        if state == "failed":
+            self._calibration_reject()
+            state = None
+        if state == "running":
+            return "done", state
+        synced = sync()
+        if state == "applied" and synced != "done":
+            warnings.warn("Links did not come up with the stored calibration")
+            self._calibration_reject()
+            return sync(), None
+        return synced, state
+
+    def _calibration_failed(self, state):
+        """Handle a failed bring-up attempt. Stored values in use are dropped
+        and released by the next _calibration_sync"""
+        if not state:
+            return None
+        self.calibration_store.remove(self.__calibration_key())
+        return "failed"
+
+    def _calibration_save(self):
+        """Store the values of the current, fully calibrated bring-up"""
+        values = dict(self._calibration_values())
+        values["cap_sel"] = self.hmc7044_cap_sel()
+        values["output_delays"] = dict(self._output_delays)
+        self.calibration_store.save(self.__calibration_key(), values)
@@ -31,37 +31,142 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import threading
+import weakref
+
 import iio
 
+from adi import discovery
+
+
+class context_pool(object):
+    """Process wide pool of IIO contexts keyed by URI
+
+    When enabled, objects created with the same URI share a single context,
+    which is reference counted and released when the last object using it is
+    closed or garbage collected. Pooling is off by default. With
+    thread_affinity set, the default, contexts are only shared between
+    objects created on the same thread, since libiio contexts must not be
+    used from multiple threads concurrently.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.thread_affinity = True
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, uri):
+        return (uri, threading.get_ident()) if self.thread_affinity else (uri, None)
+
+    def acquire(self, uri):
+        """Get a context for a URI, creating it when not pooled
+
+        returns: type=tuple(iio.Context, key)
+            The context and the key to release it with
+        """
+        if not self.enabled:
+            return discovery.take_probe(uri) or iio.Context(uri), None
+        key = self._key(uri)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                ctx = discovery.take_probe(uri) or iio.Context(uri)
+                entry = self._entries[key] = [ctx, 0]
+            entry[1] += 1
+            return entry[0], key
+
+    def release(self, key):
+        """Drop a reference taken with acquire"""
+        if key is None:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[key]
+
+    def references(self, uri):
+        """Number of objects sharing the context of a URI"""
+        with self._lock:
+            return sum(e[1] for k, e in self._entries.items() if k[0] == uri)
+
+    def clear(self):
+        """Forget all pooled contexts. Objects keep the contexts they hold"""
+        with self._lock:
+            self._entries.clear()
+
+
+pool = context_pool()
+
+
+def _holds_iio(value):
+    """Check whether a value references libiio objects of a context"""
+    if isinstance(value, (iio.Device, iio.Channel, iio.Buffer)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return any(_holds_iio(v) for v in value)
+    if isinstance(value, dict):
+        return any(_holds_iio(v) for v in value.values())
+    return False
+
 
 class context_manager(object):
     _uri_auto = "ip:analog"
     _ctx = None
+    __ctx_release = None
 
     @property
     def ctx(self) -> iio.Context:
         """IIO Context"""
         return self._ctx
 
+    def __acquire(self, uri):
+        ctx, key = pool.acquire(uri)
+        if key is not None:
+            self.__ctx_release = weakref.finalize(self, pool.release, key)
+        return ctx
+
+    def close(self):
+        """Release the IIO context of this object. Buffers are destroyed and
+        device and channel handles dropped first, since they point into the
+        context. The context is closed once no other object created with the
+        same URI uses it. The object cannot be used afterwards"""
+        for destroy in ("rx_destroy_buffer", "tx_destroy_buffer"):
+            if hasattr(self, destroy):
+                getattr(self, destroy)()
+        for name, value in list(vars(self).items()):
+            if _holds_iio(value):
+                setattr(self, name, None)
+        if self.__ctx_release:
+            self.__ctx_release()
+            self.__ctx_release = None
+        self._ctx = None
+
     def __init__(self, uri="", _device_name=""):
         if self._ctx:
             return
+        if isinstance(uri, iio.Context):
+            # Share the context of another object
+            self._ctx = uri
+            self.uri = ""
+            return
         self.uri = uri
         try:
             if self.uri == "":
                 # Try USB contexts first
                 if _device_name != "":
-                    contexts = iio.scan_contexts()
-                    for c in contexts:
-                        if _device_name in contexts[c]:
-                            self._ctx = iio.Context(c)
-                            break
+                    c = discovery.find(description=_device_name)
+                    if c:
+                        self._ctx = self.__acquire(c)
                 # Try auto discover
                 if not self._ctx and self._uri_auto != "":
-                    self._ctx = iio.Context(self._uri_auto)
+                    self._ctx = self.__acquire(self._uri_auto)
                 if not self._ctx:
                     raise Exception("No device found")
             else:
-                self._ctx = iio.Context(self.uri)
+                self._ctx = self.__acquire(self.uri)
         except BaseException:
             raise Exception("No device found")
@@ -31,55 +31,258 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import time
+from typing import NamedTuple, Optional
+
 import numpy as np
 from adi.attribute import attribute
 
 
+class dds_sweep_result(NamedTuple):
+    """Steps applied by dds_sweep"""
+
+    timestamps: np.ndarray  # Seconds from the sweep start each step was applied
+    frequencies: np.ndarray  # Frequencies of each step, shape (steps, tones)
+    scales: np.ndarray  # Scales of each step, shape (steps, tones)
+    data: Optional[np.ndarray]  # Stacked rx() captures, one per step
+
+
 class dds(attribute):
     """ DDS Signal generators: Each reference design contains two DDSs per channel.
         this allows for two complex tones to be generated per complex channel.
+
+        DDS channels are resolved once and the last value written to, or read
+        from, each DDS attribute is remembered, so reconfiguring tones only
+        writes the attributes which changed. Call dds_invalidate when the DDSs
+        were changed by other means.
     """
 
     # Set to True if there are multiple DDS drivers (FMComms5)
     _split_cores = False
 
-    def __update_dds(self, attr, value):
+    __dds_map = None
+    __dds_shadow = None
+
+    def __init__(self):
+        self.__dds_map = None
+        self.dds_invalidate()
+
+    def __resolve_dds(self):
+        """Resolve DDS channels in altvoltage order and index them by name"""
+        channels = []
+        names = {}
         split_cores_indx = 0
         for indx in range(len(self._txdac.channels)):
+            chip_b = False
             chan = self._txdac.find_channel("altvoltage" + str(indx), True)
             if not chan and self._split_cores:
+                chip_b = True
                 chan = self._txdac_chip_b.find_channel(
                     "altvoltage" + str(split_cores_indx), True
                 )
                 split_cores_indx = split_cores_indx + 1
             if not chan:
-                return
-            if indx >= len(value):
-                return
-            if attr == "raw":
-                chan.attrs[attr].value = str(int(value[indx]))
-            else:
-                chan.attrs[attr].value = str(value[indx])
-            indx = indx + 1
+                continue
+            if chan.name:
+                names[(chip_b, chan.name)] = len(channels)
+            channels.append(chan)
+        self.__dds_map = (channels, names)
+        return self.__dds_map
+
+    def _dds_channels(self):
+        """DDS channels in altvoltage order"""
+        return (self.__dds_map or self.__resolve_dds())[0]
+
+    def _dds_index(self, channel, tone, part="I"):
+        """Index into _dds_channels of the DDS generating a tone
+
+        parameters:
+            channel: type=integer
+                Channel index as used by dds_single_tone
+            tone: type=integer
+                Tone index, 0 or 1
+            part: type=string
+                "I" or "Q" component for complex devices
+        """
+        names = (self.__dds_map or self.__resolve_dds())[1]
+        if self._complex_data:
+            suffix = "_" + part + "_F" + str(tone + 1)
+            index = names.get((False, "TX" + str(channel + 1) + suffix))
+            if index is None and self._split_cores:
+                channel_b = channel - int(self._num_tx_channels / 4)
+                index = names.get((True, "TX" + str(channel_b + 1) + suffix))
+        else:
+            index = names.get((False, str(channel + 1) + "AB"[tone]))
+        if index is None:
+            raise Exception(f"No DDS found for channel {channel} tone {tone}")
+        return index
+
+    def dds_invalidate(self):
+        """Forget the last known DDS state, so the next configuration writes
+        every attribute"""
+        self.__dds_shadow = {}
+
+    def __shadow(self, index):
+        if self.__dds_shadow is None:
+            self.dds_invalidate()
+        return self.__dds_shadow.setdefault(index, {})
+
+    def __write_dds(self, index, attr, value):
+        value = str(int(value)) if attr == "raw" else str(value)
+        shadow = self.__shadow(index)
+        if shadow.get(attr) == value:
+            return
+        self._dds_channels()[index].attrs[attr].value = value
+        shadow[attr] = value
+
+    def __update_dds(self, attr, value):
+        for indx in range(min(len(value), len(self._dds_channels()))):
+            self.__write_dds(indx, attr, value[indx])
 
     def _read_dds(self, attr):
         values = []
-        split_cores_indx = 0
-        for indx in range(len(self._txdac.channels)):
-            chan = self._txdac.find_channel("altvoltage" + str(indx), True)
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "altvoltage" + str(split_cores_indx), True
-                )
-                split_cores_indx = split_cores_indx + 1
-            if not chan:
-                continue
-            values.append(chan.attrs[attr].value)
-            indx = indx + 1
+        for indx, chan in enumerate(self._dds_channels()):
+            value = chan.attrs[attr].value
+            self.__shadow(indx)[attr] = value
+            values.append(value)
         if values == []:
             return None
         return values
 
+    def dds_configure(self, tones, mute_others=True):
+        """ Configure tones on multiple channels at once.
+            Tones are generated as by dds_single_tone and dds_dual_tone, but
+            only DDS attributes which differ from their last known value are
+            written.
+
+            parameters:
+                tones: type=dict
+                    Map of channel index to a list of up to two (frequency,
+                    scale) tuples, one per tone. A list or array of such
+                    lists, indexed by channel, is also accepted. For complex
+                    devices negative frequencies generate tones below the
+                    carrier.
+
+                mute_others: type=bool
+                    Zero the scale and phase of all DDSs not generating one
+                    of the tones, as dds_single_tone does. When False they
+                    are left untouched.
+        """
+        if not isinstance(tones, dict):
+            tones = dict(enumerate(tones))
+
+        # Target state of each DDS, by index into _dds_channels
+        target = {}
+        for channel, channel_tones in tones.items():
+            for tone, (frequency, scale) in enumerate(channel_tones):
+                if self._complex_data:
+                    if frequency < 0:
+                        frequency = np.abs(frequency)
+                        A, B = "Q", "I"
+                    else:
+                        A, B = "I", "Q"
+                    parts = [(A, 90000), (B, 0)]
+                else:
+                    if frequency < 0:
+                        raise Exception("Frequency must be positive")
+                    parts = [(None, 0)]
+                for part, phase in parts:
+                    target[self._dds_index(channel, tone, part)] = [
+                        ("frequency", frequency),
+                        ("phase", phase),
+                        ("scale", scale),
+                        ("raw", 1),
+                    ]
+
+        # Mute unused DDSs first so stale tones are not combined with new ones
+        if mute_others:
+            for indx, _ in enumerate(self._dds_channels()):
+                if indx not in target:
+                    self.__write_dds(indx, "scale", 0)
+                    self.__write_dds(indx, "phase", 0)
+                    self.__write_dds(indx, "raw", 1)
+        for indx, attrs in target.items():
+            for attr, value in attrs:
+                self.__write_dds(indx, attr, value)
+
+    def dds_sweep(
+        self,
+        frequencies,
+        scales,
+        channel=0,
+        interval=None,
+        capture=False,
+        settle=0,
+        discard=0,
+    ):
+        """ Step DDS tones through a list of frequencies and scales.
+            Each step is applied with dds_configure, so only the attributes
+            which change from one step to the next are written.
+
+            parameters:
+                frequencies: type=list
+                    Frequencies in hertz per step. Either one value per step
+                    for a single tone, or a (steps, 2) array for two tones.
+
+                scales: type=list
+                    Scales in range [0,1]. A single value, one value per step,
+                    or one value per step and tone.
+
+                channel: type=integer
+                    Channel index to generate tones from, as for
+                    dds_single_tone.
+
+                interval: type=float
+                    Seconds between the starts of consecutive steps. Steps are
+                    scheduled from the sweep start so delays do not
+                    accumulate. When None steps run back to back.
+
+                capture: type=bool
+                    Call rx() after each step and return the captures.
+
+                settle: type=float
+                    Seconds to wait after applying a step before capturing.
+
+                discard: type=integer
+                    Number of rx() captures to drop after each step, to
+                    flush data buffered before the step was applied.
+
+            returns: type=dds_sweep_result
+                Timestamps, applied frequencies and scales, and when
+                capturing, the captures stacked along a leading step axis.
+        """
+        frequencies = np.asarray(frequencies, dtype=float)
+        if frequencies.ndim == 1:
+            frequencies = frequencies[:, np.newaxis]
+        if frequencies.ndim != 2 or frequencies.shape[1] not in (1, 2):
+            raise Exception("frequencies must have one or two tones per step")
+        scales = np.asarray(scales, dtype=float)
+        if scales.ndim == 1:
+            scales = scales[:, np.newaxis]
+        scales = np.broadcast_to(scales, frequencies.shape)
+
+        steps = len(frequencies)
+        timestamps = np.empty(steps)
+        captures = []
+        start = time.perf_counter()
+        for step in range(steps):
+            if interval:
+                delay = start + step * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            tones = list(zip(frequencies[step].tolist(), scales[step].tolist()))
+            self.dds_configure({channel: tones})
+            timestamps[step] = time.perf_counter() - start
+            if capture:
+                if settle:
+                    time.sleep(settle)
+                for _ in range(discard):
+                    self.rx()
+                captures.append(np.asarray(self.rx()))
+
+        data = np.stack(captures) if captures else None
+        return dds_sweep_result(timestamps, frequencies, scales, data)
+
     def disable_dds(self):
         """Disable all DDS channels and set all output sources to zero."""
         self.dds_enabled = np.zeros(self._num_tx_channels * 2, dtype=bool)
@@ -146,56 +349,7 @@ class dds(attribute):
                     the index of the individual converters.
 
         """
-        chans = len(self.dds_scales)
-        self.dds_scales = [0] * chans
-        self.dds_phases = [0] * chans
-        self.dds_enabled = [1] * chans
-        # Set up tone
-        if self._complex_data:
-            if frequency < 0:
-                frequency = np.abs(frequency)
-                A = "Q"
-                B = "I"
-            else:
-                A = "I"
-                B = "Q"
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + A + "_F1", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + A
-                    + "_F1",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency)
-            chan.attrs["phase"].value = str(90000)
-            chan.attrs["scale"].value = str(scale)
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + B + "_F1", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + B
-                    + "_F1",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale)
-        else:
-            if frequency < 0:
-                Exception("Frequency must be positive")
-            chan = self._txdac.find_channel(str(channel + 1) + "A", True)
-            chan.attrs["frequency"].value = str(frequency)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale)
+        self.dds_configure({channel: [(frequency, scale)]})
 
     def dds_dual_tone(self, frequency1, scale1, frequency2, scale2, channel=0):
         """ Generate two tones simultaneously using the DDSs
@@ -227,98 +381,4 @@ class dds(attribute):
                     the index of the individual converters.
 
         """
-        chans = len(self.dds_scales)
-        self.dds_scales = [0] * chans
-        self.dds_phases = [0] * chans
-        self.dds_enabled = [1] * chans
-        # Set up tone
-        if self._complex_data:
-            # Channel 1
-            if frequency1 < 0:
-                frequency1 = np.abs(frequency1)
-                A = "Q"
-                B = "I"
-            else:
-                A = "I"
-                B = "Q"
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + A + "_F1", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + A
-                    + "_F1",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency1)
-            chan.attrs["phase"].value = str(90000)
-            chan.attrs["scale"].value = str(scale1)
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + B + "_F1", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + B
-                    + "_F1",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency1)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale1)
-            # Channel 2
-            if frequency2 < 0:
-                frequency2 = np.abs(frequency2)
-                A = "Q"
-                B = "I"
-            else:
-                A = "I"
-                B = "Q"
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + A + "_F2", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + A
-                    + "_F2",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency2)
-            chan.attrs["phase"].value = str(90000)
-            chan.attrs["scale"].value = str(scale2)
-            chan = self._txdac.find_channel(
-                "TX" + str(channel + 1) + "_" + B + "_F2", True
-            )
-            if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "TX"
-                    + str(channel - int(self._num_tx_channels / 4) + 1)
-                    + "_"
-                    + B
-                    + "_F2",
-                    True,
-                )
-            chan.attrs["frequency"].value = str(frequency2)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale2)
-        else:
-            if frequency1 < 0:
-                Exception("Frequency must be positive")
-            if frequency2 < 0:
-                Exception("Frequency must be positive")
-            chan = self._txdac.find_channel(str(channel + 1) + "A", True)
-            chan.attrs["frequency"].value = str(frequency1)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale1)
-            chan = self._txdac.find_channel(str(channel + 1) + "B", True)
-            chan.attrs["frequency"].value = str(frequency2)
-            chan.attrs["phase"].value = str(0)
-            chan.attrs["scale"].value = str(scale2)
+        self.dds_configure({channel: [(frequency1, scale1), (frequency2, scale2)]})
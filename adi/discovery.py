@@ -0,0 +1,225 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Discovery of IIO contexts
+
+Candidate contexts from iio.scan_contexts are probed concurrently with a
+timeout to list their devices. Results are cached on disk for a short time
+so repeated discovery, for example across processes, does not scan again,
+and the contexts opened while probing are handed to the context pool
+instead of being opened a second time.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import List, NamedTuple
+
+import iio
+
+# Seconds cached discovery results stay valid
+ttl = 30.0
+# Seconds to wait for probed contexts
+timeout = 5.0
+
+_probes = {}
+_lock = threading.Lock()
+
+
+class context_info(NamedTuple):
+    """A discovered context"""
+
+    uri: str
+    description: str
+    devices: List[str]  # Device names, empty when not probed or unreachable
+
+
+def cache_dir():
+    """Directory of pyadi-iio cache files"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pyadi-iio")
+
+
+def _cache_file():
+    return os.path.join(cache_dir(), "contexts.json")
+
+
+def _load_cache():
+    try:
+        with open(_cache_file()) as f:
+            cache = json.load(f)
+        if time.time() - cache["time"] > ttl:
+            return None
+        return [context_info(*c) for c in cache["contexts"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cache(contexts):
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        tmp = _cache_file() + ".{}".format(os.getpid())
+        with open(tmp, "w") as f:
+            json.dump({"time": time.time(), "contexts": contexts}, f)
+        os.replace(tmp, _cache_file())
+    except OSError:
+        pass
+
+
+def invalidate():
+    """Remove cached discovery results"""
+    try:
+        os.remove(_cache_file())
+    except OSError:
+        pass
+
+
+def _probe(uri, expired):
+    """Open a context and list its devices. The context is kept for
+    take_probe unless expired was set in the meantime, in which case the
+    result is dropped and None returned"""
+    ctx = iio.Context(uri)
+    devices = [dev.name for dev in ctx.devices]
+    with _lock:
+        if expired.is_set():
+            return None
+        _probes[uri] = ctx
+    return devices
+
+
+def _probe_all(uris, limit):
+    """Probe contexts concurrently, waiting at most limit seconds. Returns
+    the devices of each context probed in time"""
+    devices = {}
+    expired = threading.Event()
+
+    def run(uri):
+        try:
+            result = _probe(uri, expired)
+        except Exception:
+            return
+        if result is not None:
+            devices[uri] = result
+
+    # Daemon threads, so unresponsive contexts do not block exit
+    threads = [threading.Thread(target=run, args=(uri,), daemon=True) for uri in uris]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + limit
+    for thread in threads:
+        thread.join(max(0, deadline - time.monotonic()))
+    # Probes finishing from now on are discarded
+    with _lock:
+        expired.set()
+        return dict(devices)
+
+
+def take_probe(uri):
+    """Get the context opened for a URI while probing, if any. Each probe
+    context is handed out once"""
+    with _lock:
+        return _probes.pop(uri, None)
+
+
+def scan(probe=True, use_cache=True):
+    """Discover available contexts
+
+    parameters:
+        probe: type=bool
+            Open each context concurrently to list its devices
+        use_cache: type=bool
+            Return cached results when they are younger than ttl
+
+    returns: type=list[context_info]
+    """
+    if use_cache:
+        cached = _load_cache()
+        if cached is not None and (not probe or any(c.devices for c in cached)):
+            return cached
+
+    found = iio.scan_contexts()
+    devices = _probe_all(list(found), timeout) if probe and found else {}
+    contexts = [context_info(uri, found[uri], devices.get(uri, [])) for uri in found]
+    if probe:
+        _save_cache(contexts)
+    return contexts
+
+
+def find(devices=(), description=""):
+    """Find the URI of a context with all given devices, or whose
+    description contains a string
+
+    Cached results are validated by opening the context within timeout
+    seconds. When they turn out to be stale the cache is dropped and
+    contexts are scanned again.
+
+    parameters:
+        devices: type=list[string]
+            Names of devices required in the context
+        description: type=string
+            Substring of the context description, used when no devices are
+            given
+
+    returns: type=string
+        URI of the first matching context or None
+    """
+
+    def match(info):
+        if devices:
+            return all(dev in info.devices for dev in devices)
+        return description in info.description
+
+    def found(uri):
+        # Only the probe context of the selected URI is kept for reuse
+        with _lock:
+            for other in [u for u in _probes if u != uri]:
+                del _probes[other]
+        return uri
+
+    cached = _load_cache()
+    for info in cached or []:
+        if match(info):
+            probed = _probe_all([info.uri], timeout).get(info.uri)
+            if probed is not None and all(dev in probed for dev in devices):
+                return found(info.uri)
+            invalidate()
+            break
+
+    for info in scan(probe=bool(devices), use_cache=False):
+        if match(info):
+            return found(info.uri)
+    found(None)
+    return None
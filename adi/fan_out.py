@@ -0,0 +1,120 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Concurrent fan-out of operations across multiple devices
+
+Operations on devices of different IIO contexts, for example separate SOMs,
+run concurrently while operations on the same context are serialized, since
+libiio contexts are not thread safe.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Upper bound of threads used by a single fan-out
+max_workers = 16
+
+
+class fan_out_error(Exception):
+    """Raised when several operations of a fan-out fail
+
+    The errors member maps the key of each failed operation to its exception.
+    Operations which did not fail have completed.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        details = ", ".join(f"{key}: {err!r}" for key, err in errors.items())
+        super().__init__(f"{len(errors)} device operation(s) failed ({details})")
+
+
+def device_context(dev, default=None):
+    """Context of an IIO device, or default when the bindings do not link
+    devices to their context"""
+    ctx = getattr(dev, "ctx", None)
+    if callable(ctx):
+        ctx = ctx()
+    return ctx if ctx is not None else default
+
+
+def fan_out(tasks, per_context=1):
+    """Run operations across devices and collect their results in order
+
+    parameters:
+        tasks: type=list
+            List of (key, context, function) tuples. The key names the
+            operation in errors, the context groups operations which must
+            not run concurrently and function is called without arguments
+        per_context: type=int
+            Operations allowed to run concurrently on the same context
+
+    returns: type=list
+        Return values of the functions in the order of tasks
+
+    raises: fan_out_error
+        After all operations finished, when more than one of them raised.
+        A single failure is raised as is. When all operations share one
+        context they run in order on the calling thread and the first
+        exception propagates immediately
+    """
+    lanes = {}
+    for index, (key, ctx, func) in enumerate(tasks):
+        group = lanes.setdefault(id(ctx), [[] for _ in range(per_context)])
+        lane = min(group, key=len)
+        lane.append((index, key, func))
+    lanes = [lane for group in lanes.values() for lane in group if lane]
+
+    results = [None] * len(tasks)
+    errors = {}
+    lock = threading.Lock()
+
+    def run(lane):
+        for index, key, func in lane:
+            try:
+                results[index] = func()
+            except Exception as ex:
+                with lock:
+                    errors[key] = ex
+
+    if len(lanes) == 1:
+        for index, _, func in lanes[0]:
+            results[index] = func()
+        return results
+    if lanes:
+        with ThreadPoolExecutor(min(len(lanes), max_workers)) as pool:
+            list(pool.map(run, lanes))
+    if len(errors) == 1:
+        raise next(iter(errors.values()))
+    if errors:
+        raise fan_out_error({key: errors[key] for key, _, _ in tasks if key in errors})
+    return results
@@ -37,6 +37,7 @@ from adi.adf5610 import adf5610
 from adi.adl5960 import adl5960
 from adi.admv8818 import admv8818
 from adi.adrf5720 import adrf5720
+from adi.context_manager import context_manager
 from adi.gen_mux import genmux
 from adi.one_bit_adc_dac import one_bit_adc_dac
 
@@ -47,16 +48,19 @@ class fmcvna(adrf5720, ad9083, admv8818, genmux, adf5610, adl5960):
     frontend = [0] * 8
 
     def __init__(self, uri):
-        self.lo = adf5610(uri, device_name="adf5610")
-        self.rfin_attenuator = adrf5720(uri, device_name="adrf5720-rfin")
-        self.lo_attenuator = adrf5720(uri, device_name="adrf5720-lo")
-        self.rfin_bpf = admv8818(uri, device_name="admv8818-rfin")
-        self.lo_bpf = admv8818(uri, device_name="admv8818-lo")
-        self.rfin_mux = genmux(uri, device_name="mux-rfin")
-        self.lo_mux = genmux(uri, device_name="mux-doubler")
+        # All parts share the context of the board
+        context_manager.__init__(self, uri)
+        ctx = self._ctx
+        self.lo = adf5610(ctx, device_name="adf5610")
+        self.rfin_attenuator = adrf5720(ctx, device_name="adrf5720-rfin")
+        self.lo_attenuator = adrf5720(ctx, device_name="adrf5720-lo")
+        self.rfin_bpf = admv8818(ctx, device_name="admv8818-rfin")
+        self.lo_bpf = admv8818(ctx, device_name="admv8818-lo")
+        self.rfin_mux = genmux(ctx, device_name="mux-rfin")
+        self.lo_mux = genmux(ctx, device_name="mux-doubler")
 
         for i in range(1, 9):
-            self.frontend[i - 1] = adl5960(uri, device_name=f"adl5960-{i}")
+            self.frontend[i - 1] = adl5960(ctx, device_name=f"adl5960-{i}")
 
         ad9083.__init__(self, uri)
         one_bit_adc_dac.__init__(self, uri)
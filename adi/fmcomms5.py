@@ -35,10 +35,14 @@ from adi.ad936x import ad9361
 from adi.context_manager import context_manager
 from adi.rx_tx import rx_tx
 
-try:
-    import ad9361 as libad9361
-except ImportError:
-    libad9361 = None
+
+def _multichip_sync(ctx):
+    """Run libad9361 multi-chip sync, if its bindings are installed"""
+    try:
+        import ad9361 as libad9361
+    except ImportError:
+        return
+    libad9361.fmcomms5_multichip_sync(ctx, 3)
 
 
 class FMComms5(ad9361):
@@ -77,8 +81,7 @@ class FMComms5(ad9361):
         self._rxadc_chip_b = self._ctx.find_device("cf-ad9361-B")
         self._txdac_chip_b = self._ctx.find_device("cf-ad9361-dds-core-B")
         rx_tx.__init__(self)  # pylint: disable=W0233
-        if libad9361:
-            libad9361.fmcomms5_multichip_sync(self._ctx, 3)
+        _multichip_sync(self._ctx)
 
     @property
     def filter(self):
@@ -96,8 +99,7 @@ class FMComms5(ad9361):
         self._set_iio_dev_attr_str("filter_fir_config", data, self._ctrl_b)
         self._set_iio_attr("out", "voltage_filter_fir_en", False, 1)
         self._set_iio_attr("out", "voltage_filter_fir_en", False, 1, self._ctrl_b)
-        if libad9361:
-            libad9361.fmcomms5_multichip_sync(self._ctx, 3)
+        _multichip_sync(self._ctx)
 
     @property
     def loopback_chip_b(self):
@@ -306,8 +308,7 @@ class FMComms5(ad9361):
             self._set_iio_attr("out", "voltage_filter_fir_en", False, 1)
             self._set_iio_attr("out", "voltage_filter_fir_en", False, 1, self._ctrl_b)
 
-        if libad9361:
-            libad9361.fmcomms5_multichip_sync(self._ctx, 3)
+        _multichip_sync(self._ctx)
 
     @property
     def rx_lo_chip_b(self):
@@ -0,0 +1,177 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Timing instrumentation of attribute and buffer I/O
+
+Events are emitted from the attribute helpers and the rx/tx buffer paths of
+every driver while at least one sink is registered. A sink is any callable
+taking an io_event. When no sink is registered the instrumented paths only
+check the module level active flag.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+# Checked on hot paths, True while sinks are registered
+active = False
+clock = time.perf_counter
+_sinks = []
+
+
+class io_event(NamedTuple):
+    """A timed I/O operation"""
+
+    # One of attr_read, attr_write, rx_refill, rx_read, rx_convert,
+    # rx_annotate, tx_write or tx_push
+    kind: str
+    device: str  # Name of the IIO device
+    name: str  # Attribute as channel/attribute or the buffer operation
+    seconds: float
+    timestamp: float  # time.time() when the operation completed
+
+
+def add_sink(sink):
+    """Register a callable receiving io_event objects"""
+    global active
+    _sinks.append(sink)
+    active = True
+
+
+def remove_sink(sink):
+    """Unregister a sink added with add_sink"""
+    global active
+    _sinks.remove(sink)
+    active = bool(_sinks)
+
+
+def emit(kind, device, name, seconds):
+    """Send an event to all registered sinks"""
+    event = io_event(kind, device, name, seconds, time.time())
+    for sink in list(_sinks):
+        sink(event)
+
+
+class summary_sink(object):
+    """In-memory counters and latency histograms per (kind, device, name)
+
+    Histogram bins are decades from 1 us to 10 s, with one bin below and one
+    above the range.
+    """
+
+    bins = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, 10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __call__(self, event):
+        key = (event.kind, event.device, event.name)
+        bin_index = sum(event.seconds >= b for b in self.bins)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "count": 0,
+                    "total": 0.0,
+                    "min": event.seconds,
+                    "max": event.seconds,
+                    "histogram": [0] * (len(self.bins) + 1),
+                }
+            stats["count"] += 1
+            stats["total"] += event.seconds
+            stats["min"] = min(stats["min"], event.seconds)
+            stats["max"] = max(stats["max"], event.seconds)
+            stats["histogram"][bin_index] += 1
+
+    def summary(self):
+        """Copy of the statistics keyed by (kind, device, name), sorted by
+        total time spent"""
+        with self._lock:
+            items = [
+                (key, dict(stats, histogram=list(stats["histogram"])))
+                for key, stats in self._stats.items()
+            ]
+        for _, stats in items:
+            stats["mean"] = stats["total"] / stats["count"]
+        return dict(sorted(items, key=lambda kv: -kv[1]["total"]))
+
+    def reset(self):
+        """Clear all statistics"""
+        with self._lock:
+            self._stats.clear()
+
+
+class jsonl_sink(object):
+    """Write each event as a JSON object per line to a file
+
+    parameters:
+        file: type=string or file object
+            File name to append to or an open text file
+    """
+
+    def __init__(self, file):
+        self._own = isinstance(file, str)
+        self._file = open(file, "a") if self._own else file
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event._asdict())
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        """Close the file if it was opened by the sink"""
+        if self._own:
+            self._file.close()
+
+
+@contextmanager
+def profile(sink=None):
+    """Register a sink for the duration of a with block
+
+    parameters:
+        sink: type=callable
+            Sink to register, a new summary_sink by default
+
+    returns: type=callable
+        The registered sink
+    """
+    sink = sink if sink is not None else summary_sink()
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
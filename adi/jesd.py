@@ -33,7 +33,12 @@
 
 """JESD Shim import to handle JESD as optional dependency"""
 
+from importlib.util import find_spec
+
+# sshfs imports paramiko on first connection, so only check it is installed
 try:
+    if find_spec("paramiko") is None:
+        raise ImportError("paramiko not installed")
     from .sshfs import sshfs
     from .jesd_internal import jesd
 except ImportError:
@@ -0,0 +1,187 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Synchronization of the JESD204 FSM across multiple devices
+
+With the JESD204 FSM in paused mode each device stops after every state
+until resumed, so devices on separate boards can be stepped through link
+bring-up in lockstep. sync polls all devices concurrently, resumes them,
+the primary last, once all are paused in the same state and returns when
+all are done. Polls back off while nothing changes and the whole sequence
+is bounded by a deadline. State changes of each device are recorded in a
+timeline.
+"""
+
+import time
+from functools import partial
+from typing import NamedTuple
+
+from adi.fan_out import fan_out
+
+# State of devices which completed link bring-up
+done_state = "opt_post_running_stage"
+
+
+class fsm_event(NamedTuple):
+    """Observed change of the FSM of a device"""
+
+    time: float  # Seconds from the start of the sync
+    state: str
+    status: str  # running, paused, done or error
+    error: int
+
+
+def device_status(dev):
+    """Read the FSM of a device
+
+    returns: type=tuple
+        Status (running, paused, done or error), state and error code
+    """
+    err = dev.jesd204_fsm_error
+    paused = dev.jesd204_fsm_paused
+    state = dev.jesd204_fsm_state
+    if err:
+        status = "error"
+    elif paused:
+        status = "paused"
+    elif state == done_state:
+        status = "done"
+    else:
+        status = "running"
+    return status, state, err
+
+
+def _describe(dev, index, status, state, err):
+    return "%s: DEVICE%d: Is <%s> in state <%s> with status <%d>" % (
+        dev.uri,
+        index,
+        "Paused" if status == "paused" else "Running",
+        state,
+        err,
+    )
+
+
+def _resume(dev):
+    dev.jesd204_fsm_resume = "1"
+
+
+def sync(devs, timeline, timeout=60.0, poll_min=0.001, poll_max=0.1, verbose=False):
+    """Step the JESD204 FSM of devices in lockstep until all are done
+
+    parameters:
+        devs: type=list
+            Devices with jesd204_fsm properties, uri and _ctx members. The
+            first device is the primary, which is resumed from a paused
+            state only after all other devices were resumed concurrently
+        timeline: type=dict
+            Filled with a list of fsm_event for each device uri
+        timeout: type=float
+            Seconds after which synchronization is abandoned
+        poll_min: type=float
+            Delay in seconds between polls right after a change
+        poll_max: type=float
+            Longest delay in seconds between polls
+        verbose: type=bool
+            Print each state change
+
+    returns: type=string
+        "done" when all devices completed, "error" when a device reported
+        an error
+
+    raises: Exception
+        When the deadline passes or devices are paused in different states
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = poll_min
+    last = [None] * len(devs)
+    for dev in devs:
+        timeline[dev.uri] = []
+
+    while True:
+        statuses = fan_out(
+            [(dev.uri, dev._ctx, partial(device_status, dev)) for dev in devs]
+        )
+        now = time.monotonic()
+
+        changed = False
+        for index, (dev, current) in enumerate(zip(devs, statuses)):
+            if current == last[index]:
+                continue
+            changed = True
+            last[index] = current
+            status, state, err = current
+            timeline[dev.uri].append(fsm_event(now - start, state, status, err))
+            if verbose:
+                print(_describe(dev, index, status, state, err))
+
+        for index, (dev, (status, state, err)) in enumerate(zip(devs, statuses)):
+            if status == "error":
+                print("\nERROR " + _describe(dev, index, status, state, err) + "\n")
+                return "error"
+
+        kinds = {status for status, _, _ in statuses}
+        if kinds == {"done"}:
+            return "done"
+
+        # Resume once every device reached the same paused state
+        if kinds <= {"paused", "done"}:
+            states = {state for _, state, _ in statuses}
+            if len(states) > 1:
+                raise Exception(
+                    "JESD204 FSM out of lockstep: "
+                    + ", ".join(
+                        f"{dev.uri} in {state}"
+                        for dev, (_, state, _) in zip(devs, statuses)
+                    )
+                )
+            paused = [
+                dev for dev, (status, _, _) in zip(devs, statuses) if status == "paused"
+            ]
+            # The primary drives SYSREF, so it steps only after all others
+            primary = paused.pop(0) if paused and paused[0] is devs[0] else None
+            fan_out([(dev.uri, dev._ctx, partial(_resume, dev)) for dev in paused])
+            if primary is not None:
+                _resume(primary)
+            changed = True
+
+        if now >= deadline:
+            raise Exception(
+                f"JESD204 FSM sync timed out after {timeout} s: "
+                + ", ".join(
+                    f"{dev.uri} {status} in {state}"
+                    for dev, (status, state, _) in zip(devs, statuses)
+                )
+            )
+        delay = poll_min if changed else min(delay * 2, poll_max)
+        time.sleep(min(delay, max(0, deadline - time.monotonic())))
@@ -31,6 +31,7 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from adi import topology as topology_cache
 from adi.attribute import attribute
 from adi.context_manager import context_manager
 
@@ -78,25 +79,46 @@ class one_bit_adc_dac(attribute, context_manager):
         except Exception:
             raise Exception(f"No device found for {name}")
 
-        self._ctrl = None
+        topology = topology_cache.load(self._ctx, "one_bit_adc_dac", name)
+        if topology is None or not self.__use_topology(topology):
+            topology = self.__find_topology(name)
+            self.__use_topology(topology)
+            topology_cache.save(self._ctx, "one_bit_adc_dac", topology, name)
+
+    def __use_topology(self, topology):
+        """Apply a topology, returns False if it does not match the context"""
+        self._ctrl = self._ctx.find_device(topology["ctrl"])
+        if not self._ctrl or not all(
+            self._ctrl.find_channel(channel_name, output)
+            for _, channel_name, output in topology["pins"]
+        ):
+            return False
+        for label, channel_name, output in topology["pins"]:
+            setattr(
+                type(self),
+                f"gpio_{label}",
+                _dyn_property(
+                    "raw", dev=self._ctrl, channel_name=channel_name, output=output
+                ),
+            )
+        return True
 
+    def __find_topology(self, name):
+        ctrl = None
         for dev in self._ctx.devices:
             if "label" in dev.attrs and dev.attrs["label"].value == name:
-                self._ctrl = dev
+                ctrl = dev
                 break
             else:
                 if dev.name == name:
-                    self._ctrl = dev
+                    ctrl = dev
                     break
 
-        if not self._ctrl:
+        if not ctrl:
             raise Exception(f"No device found for {name}")
 
-        for chan in self._ctrl.channels:
-            setattr(
-                type(self),
-                f"gpio_{chan.attrs['label'].value.lower()}",
-                _dyn_property(
-                    "raw", dev=self._ctrl, channel_name=chan.id, output=chan.output
-                ),
-            )
+        pins = [
+            (chan.attrs["label"].value.lower(), chan.id, chan.output)
+            for chan in ctrl.channels
+        ]
+        return {"ctrl": ctrl.id, "pins": pins}
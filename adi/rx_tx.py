@@ -31,17 +31,408 @@
 # STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
 # THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import ctypes
+import queue
+import threading
+import time
 from abc import ABCMeta, abstractmethod
-from typing import List, Union
+from collections import deque
+from typing import List, NamedTuple, Tuple, Union
 
 import iio
 
 import numpy as np
-from adi.attribute import attribute
+from adi import discovery, instrumentation
+from adi.attribute import _attr_reader, _write_count, attribute, get_numbers
 from adi.context_manager import context_manager
 from adi.dds import dds
 
 
+def _scan_layout(dev):
+    """Byte layout of the enabled input scan elements of a device
+
+    Mirrors libiio: scan elements are packed in scan index order and each is
+    aligned to its own storage size. Channels sharing an index share samples.
+
+    returns: tuple(step, dict)
+        Size of one sample across all channels in bytes and a map of
+        channel id to (byte offset, data format)
+    """
+    chans = [
+        chan
+        for chan in dev.channels
+        if chan.scan_element and not chan.output and chan.enabled
+    ]
+    layout = {}
+    step = 0
+    last = None
+    for chan in sorted(chans, key=lambda c: c.index):
+        df = chan.data_format
+        if last is not None and chan.index == last.index:
+            layout[chan.id] = (layout[last.id][0], df)
+            continue
+        length = df.length // 8 * df.repeat
+        if step % length:
+            step += length - step % length
+        layout[chan.id] = (step, df)
+        step += length
+        last = chan
+    return step, layout
+
+
+def _buffer_memory(buf):
+    """Writable uint8 view of the memory of a libiio buffer. This avoids the
+    intermediate copy made by Buffer.read(). Returns None when the bindings do
+    not expose the buffer pointers.
+    """
+    try:
+        start = iio._buffer_start(buf._buffer)
+        end = iio._buffer_end(buf._buffer)
+    except AttributeError:
+        return None
+    if not start or not end or end <= start:
+        return None
+    return np.ctypeslib.as_array((ctypes.c_uint8 * (end - start)).from_address(start))
+
+
+def _scan_needs_convert(df):
+    return df.shift != 0 or df.bits < df.length or (df.is_be and df.length > 8)
+
+
+def _scan_view(raw, offset, step, df):
+    """Strided view of a single channel within a raw interleaved buffer"""
+    width = df.length // 8
+    dt = np.dtype(
+        ("i" if df.is_signed is True else "u") + str(width)
+    ).newbyteorder(">" if df.is_be else "=")
+    return np.ndarray(
+        shape=(len(raw) // step,), dtype=dt, buffer=raw, offset=offset, strides=(step,)
+    )
+
+
+def _scan_convert(view, df, out=None):
+    """Apply the libiio sample conversion (byte order, shift and sign
+    extension) to a raw channel view. Views of fully defined native samples
+    are returned as is without copying.
+    """
+    if not _scan_needs_convert(df) and out is None:
+        return view
+    width = df.length // 8
+    if out is None:
+        out = np.empty(view.shape, dtype=view.dtype.newbyteorder("="))
+    u = out.view("u" + str(width))
+    np.copyto(u, view.view(view.dtype.byteorder + "u" + str(width)), "unsafe")
+    if df.shift:
+        np.right_shift(u, df.shift, out=u)
+    if df.bits < df.length:
+        np.bitwise_and(u, (1 << df.bits) - 1, out=u)
+        if df.is_signed:
+            sign = 1 << (df.bits - 1)
+            np.bitwise_xor(u, sign, out=u)
+            np.subtract(out, sign, out=out)
+    return out
+
+
+def _parse_samples(values):
+    """Parse attribute strings into a float64 array in a single vectorized
+    step, falling back to parsing each value when they are not plain numbers"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        pass
+    parsed = [get_numbers(v) for v in values]
+    for v, p in zip(values, parsed):
+        if isinstance(p, list):
+            raise ValueError(f"Expected a single number per sample, got {v!r}")
+    return np.array(parsed, dtype=np.float64)
+
+
+def _iq_components(data):
+    """Split complex, (samples, 2) interleaved or structured (i, q) IQ data
+    into views of its in-phase and quadrature components"""
+    if not isinstance(data, np.ndarray):
+        data = np.asarray(data)
+    if data.dtype.names:
+        return data["i"], data["q"]
+    if data.ndim == 2 and data.shape[1] == 2 and not np.iscomplexobj(data):
+        return data[:, 0], data[:, 1]
+    return np.real(data), np.imag(data)
+
+
+class rx_plan(NamedTuple):
+    """Capture plan resolved when the RX buffer is created
+
+    Holds everything rx() needs to read and convert a buffer so that no
+    channel lookups or data format queries are required per capture. A plan
+    is only valid for the buffer it was created with.
+    """
+
+    buffer: object
+    enabled_channels: Tuple[int, ...]
+    buffer_size: int
+    names: Tuple[str, ...]  # Component (I/Q) channel names in output order
+    channels: Tuple[object, ...]
+    formats: Tuple[object, ...]
+    dtypes: Tuple[np.dtype, ...]
+    offsets: Tuple[int, ...]  # Byte offsets within one sample
+    step: int  # Bytes per sample across all enabled channels
+    scale: Tuple[bool, ...]  # Channels which provide a scale attribute
+    offset: Tuple[bool, ...]  # Channels which provide an offset attribute
+    layout: str  # "stacked", "views" or "channels"
+
+
+class rx_block_info(NamedTuple):
+    """Metadata delivered with each block from rx_stream"""
+
+    sequence: int  # Capture index since the stream started, gaps are drops
+    timestamp: float  # time.monotonic() when the block was captured
+    dropped: int  # Blocks discarded by the drop policy so far
+    overflows: int  # Hardware overflows detected so far
+    queued: int  # Blocks waiting in the queue when this block was delivered
+
+
+class rx_poll_info(NamedTuple):
+    """Timing of the last polled capture from rx_poll"""
+
+    samples: int
+    duration: float  # Seconds between the first and last sweep
+    rate: float  # Achieved sweeps per second
+    jitter_mean: float  # Mean deviation from the schedule in seconds
+    jitter_std: float
+    jitter_max: float
+
+
+class tx_streamer(object):
+    """Handle of a running tx_stream
+
+    Blocks are taken from the source by a producer thread into a bounded
+    queue and pushed to hardware by a second thread, so that generating
+    samples runs concurrently with DMA transfers.
+
+    attributes:
+        pushed: type=int
+            Number of blocks pushed to hardware
+        underflows: type=int
+            Number of DAC underflows detected
+        push_latencies: type=collections.deque
+            Duration in seconds of the most recent pushes
+        error: type=Exception
+            Exception raised by the producer or while pushing, if any
+    """
+
+    def __init__(self, dev, source, queue_depth, check_underflow, history):
+        self.pushed = 0
+        self.underflows = 0
+        self.push_latencies = deque(maxlen=history)
+        self.error = None
+        self._dev = dev
+        self._check_underflow = check_underflow
+        self._stop = threading.Event()
+        self._done = object()
+        if isinstance(source, queue.Queue):
+            self._blocks = source
+            self._producer = None
+        else:
+            self._blocks = queue.Queue(maxsize=queue_depth)
+            self._producer = threading.Thread(
+                target=self.__produce, args=(source,), daemon=True
+            )
+        self._pusher = threading.Thread(target=self.__push, daemon=True)
+        if self._producer:
+            self._producer.start()
+        self._pusher.start()
+
+    def __produce(self, source):
+        try:
+            if callable(source):
+                index = 0
+                while not self._stop.is_set():
+                    block = source(index)
+                    if block is None:
+                        break
+                    self.__put(block)
+                    index += 1
+            else:
+                for block in source:
+                    if self._stop.is_set():
+                        break
+                    self.__put(block)
+        except Exception as ex:
+            self.error = ex
+        self.__put(None)
+
+    def __put(self, block):
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(block, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def __underflowed(self):
+        """Check and clear the underflow flag of the DAC DMA core"""
+        status = self._dev._txdac.reg_read(0x80000088)
+        if status & 1:
+            self._dev._txdac.reg_write(0x80000088, status)
+            return True
+        return False
+
+    def __push(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    block = self._blocks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if block is None:
+                    break
+                start = time.monotonic()
+                self._dev.tx(block)
+                self.push_latencies.append(time.monotonic() - start)
+                self.pushed += 1
+                if self._check_underflow:
+                    try:
+                        if self.__underflowed():
+                            self.underflows += 1
+                    except Exception:  # Core without status register
+                        self._check_underflow = False
+        except Exception as ex:
+            self.error = ex
+        self._stop.set()
+
+    @property
+    def running(self):
+        """running: True while blocks are being pushed"""
+        return self._pusher.is_alive()
+
+    def join(self, timeout=None):
+        """join: Wait for all blocks of the source to be pushed"""
+        self._pusher.join(timeout)
+        if self.error and not self.running:
+            raise self.error
+
+    def stop(self):
+        """stop: Stop streaming after the block currently being pushed"""
+        self._stop.set()
+        self._pusher.join()
+        if self._producer:
+            self._producer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class _rx_ring(object):
+    """Ring of preallocated arrays filled by the refill thread of rx_stream
+
+    Arrays move from the free queue to the ready queue once captured and are
+    returned to the free queue when the consumer requests the next block.
+    """
+
+    def __init__(self, capture, overflowed, template, queue_depth, policy, limit):
+        self._capture = capture
+        self._overflowed = overflowed
+        self._policy = policy
+        self._limit = limit
+        self._free = queue.Queue()
+        for _ in range(queue_depth + 1):
+            self._free.put(np.empty_like(template))
+        self._discard = template
+        self._ready = queue.Queue()
+        self._stop = threading.Event()
+        self._done = object()
+        self.dropped = 0
+        self.overflows = 0
+        self.error = None
+        self._thread = threading.Thread(target=self.__refill, daemon=True)
+        self._thread.start()
+
+    def __take_slot(self):
+        """Array to capture into next, applying the drop policy when the
+        consumer has fallen behind"""
+        while not self._stop.is_set():
+            try:
+                timeout = 0.1 if self._policy == "block" else 0
+                return self._free.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            if self._policy == "newest":
+                return self._discard
+            if self._policy == "oldest":
+                try:
+                    slot, _ = self._ready.get_nowait()
+                    self.dropped += 1
+                    return slot
+                except queue.Empty:
+                    time.sleep(0.001)
+        return None
+
+    def __check_overflow(self):
+        try:
+            if self._overflowed():
+                self.overflows += 1
+        except Exception:  # Core without status register
+            self._overflowed = None
+
+    def __captured(self, slot, sequence, timestamp):
+        """Queue a captured block with its metadata"""
+        if slot is self._discard:
+            self.dropped += 1
+            return
+        info = rx_block_info(sequence, timestamp, self.dropped, self.overflows, 0)
+        self._ready.put((slot, info))
+
+    def __refill(self):
+        sequence = 0
+        try:
+            while not self._stop.is_set() and (
+                self._limit is None or sequence < self._limit
+            ):
+                slot = self.__take_slot()
+                if slot is None:
+                    break
+                self._capture(slot)
+                timestamp = time.monotonic()
+                if self._overflowed:
+                    self.__check_overflow()
+                self.__captured(slot, sequence, timestamp)
+                sequence += 1
+        except Exception as ex:
+            self.error = ex
+        self._ready.put((self._done, None))
+
+    def blocks(self):
+        """Yield captured blocks until the refill thread finishes"""
+        held = None
+        while True:
+            slot, info = self._ready.get()
+            if slot is self._done:
+                if self.error:
+                    raise self.error
+                return
+            if held is not None:
+                self._free.put(held)
+            held = slot
+            yield slot, info._replace(dropped=self.dropped, queued=self._ready.qsize())
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @classmethod
+    def stream(cls, *args):
+        """Generator starting a ring when first iterated and stopping it once
+        closed or exhausted"""
+        ring = cls(*args)
+        try:
+            yield from ring.blocks()
+        finally:
+            ring.stop()
+
+
 class phy(attribute):
     _ctrl: iio.Device = []
 
@@ -72,6 +463,24 @@ class rx(rx_tx_common):
     _rx_unbuffered_data = False
     _rx_annotated = False
     _rx_stack_interleaved = True  # Convert from channel to sample interleaved
+    _rx_single_read = False
+    _rx_stacked = False
+    _rx_si_dtype = np.float64
+    _rx_complex_format = "complex128"
+    # Attributes which, when written, invalidate cached SI conversion values
+    _rx_conversion_attrs = {
+        "scale",
+        "offset",
+        "gain",
+        "hardwaregain",
+        "calibscale",
+        "calibbias",
+        "sampling_frequency",
+    }
+    __rx_plan = None
+    __rx_conversion = None
+    __rx_out = None
+    __rx_poll_stats = None
 
     def __init__(self, rx_buffer_size=1024):
         if self._complex_data:
@@ -98,6 +507,30 @@ class rx(rx_tx_common):
         """rx_annotated: Set output data from rx() to be annotated"""
         self._rx_annotated = bool(value)
 
+    @property
+    def rx_single_read(self) -> bool:
+        """rx_single_read: Read the complete RX buffer once per rx() call and
+        demultiplex channels as strided views of it, instead of reading each
+        enabled channel out of the buffer separately"""
+        return self._rx_single_read
+
+    @rx_single_read.setter
+    def rx_single_read(self, value: bool):
+        """rx_single_read: Read the complete RX buffer once per rx() call"""
+        self._rx_single_read = bool(value)
+
+    @property
+    def rx_stacked(self) -> bool:
+        """rx_stacked: Return data from rx() as a single 2-D array of shape
+        (channels, samples) instead of a list of arrays when more than one
+        channel is enabled"""
+        return self._rx_stacked
+
+    @rx_stacked.setter
+    def rx_stacked(self, value: bool):
+        """rx_stacked: Return data from rx() as a single 2-D array"""
+        self._rx_stacked = bool(value)
+
     @property
     def rx_output_type(self) -> str:
         """rx_output_type: Set output data type from rx()"""
@@ -110,6 +543,43 @@ class rx(rx_tx_common):
             raise ValueError(f"Invalid rx_output_type: {value}. Must be raw or SI")
         self._rx_output_type = value
 
+    @property
+    def rx_complex_format(self) -> str:
+        """rx_complex_format: Representation of data from rx() for complex
+        data devices. Options are:
+            complex128: Complex 128-bit floating point samples (default)
+            complex64: Complex 64-bit floating point samples
+            interleaved: IQ pairs in the hardware data type with shape
+            (samples, 2), returned as a view of the buffer when possible
+            structured: Structured array with fields i and q
+        """
+        return self._rx_complex_format
+
+    @rx_complex_format.setter
+    def rx_complex_format(self, value: str):
+        """rx_complex_format: Representation of complex data from rx()"""
+        formats = ["complex128", "complex64", "interleaved", "structured"]
+        if value not in formats:
+            raise ValueError(
+                f"Invalid rx_complex_format: {value}. Must be one of {formats}"
+            )
+        self._rx_complex_format = value
+
+    @property
+    def rx_si_dtype(self):
+        """rx_si_dtype: Floating point type of data from rx() when
+        rx_output_type is SI. Options are numpy.float32 and numpy.float64"""
+        return self._rx_si_dtype
+
+    @rx_si_dtype.setter
+    def rx_si_dtype(self, value):
+        """rx_si_dtype: Floating point type of data from rx() in SI mode"""
+        if np.dtype(value) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError(
+                f"Invalid rx_si_dtype: {value}. Must be numpy.float32 or numpy.float64"
+            )
+        self._rx_si_dtype = np.dtype(value).type
+
     @property
     def rx_buffer_size(self):
         """rx_buffer_size: Size of receive buffer in samples"""
@@ -118,6 +588,7 @@ class rx(rx_tx_common):
     @rx_buffer_size.setter
     def rx_buffer_size(self, value):
         self.__rx_buffer_size = value
+        self.__rx_plan = None
 
     @property
     def rx_enabled_channels(self) -> List[int]:
@@ -167,14 +638,27 @@ class rx(rx_tx_common):
                 if max(value) > ((self._num_rx_channels) - 1):
                     raise Exception("RX mapping exceeds available channels")
         self.__rx_enabled_channels = value
+        self.__rx_plan = None
 
     @property
     def _num_rx_channels_enabled(self):
         return len(self.__rx_enabled_channels)
 
+    @property
+    def rx_capture_plan(self) -> Union[rx_plan, None]:
+        """rx_capture_plan: Capture plan of the current RX buffer. This is
+        None until a buffer is created and after rx_enabled_channels,
+        rx_buffer_size or the buffer itself change"""
+        plan = self.__rx_plan
+        if plan and plan.buffer is self.__rxbuf:
+            return plan
+        return None
+
     def rx_destroy_buffer(self):
         """rx_destroy_buffer: Clears RX buffer"""
         self.__rxbuf = None
+        self.__rx_plan = None
+        self.__rx_out = None
 
     def __del__(self):
         self.__rxbuf = []
@@ -184,29 +668,138 @@ class rx(rx_tx_common):
                 v.enabled = False
         self._rxadc = []
 
+    def __get_rx_channel_attrs(self, attr, default):
+        plan = self.rx_capture_plan
+        if plan:
+            available = getattr(plan, attr)
+        else:
+            available = [
+                attr in self._rxadc.find_channel(self._rx_channel_names[i]).attrs
+                for i in self.rx_enabled_channels
+            ]
+        return [
+            self._get_iio_attr(self._rx_channel_names[i], attr, False)
+            if has_attr
+            else default
+            for i, has_attr in zip(self.rx_enabled_channels, available)
+        ]
+
     def __get_rx_channel_scales(self):
-        rx_scale = []
-        for i in self.rx_enabled_channels:
-            v = self._rxadc.find_channel(self._rx_channel_names[i])
-            if "scale" in v.attrs:
-                scale = self._get_iio_attr(self._rx_channel_names[i], "scale", False)
-            else:
-                scale = 1.0
-            rx_scale.append(scale)
-        return rx_scale
+        return self.__get_rx_channel_attrs("scale", 1.0)
 
     def __get_rx_channel_offsets(self):
-        rx_offset = []
-        for i in self.rx_enabled_channels:
-            v = self._rxadc.find_channel(self._rx_channel_names[i])
-            if "offset" in v.attrs:
-                offset = self._get_iio_attr(self._rx_channel_names[i], "offset", False)
-            else:
-                offset = 0.0
-            rx_offset.append(offset)
-        return rx_offset
+        return self.__get_rx_channel_attrs("offset", 0.0)
+
+    def refresh_conversion(self):
+        """refresh_conversion: Re-read channel scales and offsets used for SI
+        conversion on the next capture. Writes through the driver, including
+        its channel objects, are tracked automatically, so this is only
+        required when they are changed externally"""
+        self.__rx_conversion = None
+
+    def __rx_conversion_coefficients(self):
+        """Scale and offset vectors of the enabled channels, cached until
+        the enabled channels change or a related attribute of the device is
+        written"""
+        conv = self.__rx_conversion
+        devs = [self._rxadc, getattr(self, "_ctrl", None)]
+        key = (
+            tuple(self.rx_enabled_channels),
+            _write_count(devs, self._rx_conversion_attrs),
+        )
+        if not conv or conv[0] != key:
+            conv = (
+                key,
+                np.array(self.__get_rx_channel_scales(), dtype=np.float64),
+                np.array(self.__get_rx_channel_offsets(), dtype=np.float64),
+            )
+            self.__rx_conversion = conv
+        return conv[1], conv[2]
+
+    def __rx_to_si(self, x, out=None):
+        """Convert raw samples to SI units with a multiply-add per channel
+        written directly into out (allocated when not provided)"""
+        scale, offset = self.__rx_conversion_coefficients()
+        if isinstance(x, np.ndarray) and x.ndim == 2:
+            scale, offset = scale[:, None], offset[:, None]
+            pairs = [(x, scale, offset, out)]
+        else:
+            out = out if out is not None else [None] * len(x)
+            pairs = zip(x, scale, offset, out)
+        res = []
+        for xi, si, oi, dst in pairs:
+            if dst is None:
+                dst = np.empty(xi.shape, dtype=self._rx_si_dtype)
+            np.multiply(xi, si, out=dst, casting="unsafe")
+            if np.any(oi):
+                np.add(dst, oi, out=dst, casting="unsafe")
+            res.append(dst)
+        return res[0] if isinstance(x, np.ndarray) and x.ndim == 2 else res
+
+    def __rx_component_names(self):
+        if self._complex_data:
+            ecn = []
+            for m in self.rx_enabled_channels:
+                ecn.extend(
+                    (self._rx_channel_names[m * 2], self._rx_channel_names[m * 2 + 1])
+                )
+            return ecn
+        return [self._rx_channel_names[m] for m in self.rx_enabled_channels]
+
+    def __rx_build_plan(self):
+        names = self.__rx_component_names()
+        channels = [self._rxadc.find_channel(name) for name in names]
+        formats = [chan.data_format for chan in channels]
+        dtypes = [
+            np.dtype(("i" if df.is_signed is True else "u") + str(df.length // 8))
+            for df in formats
+        ]
+        step, scan = _scan_layout(self._rxadc)
+        offsets = [scan[name][0] if name in scan else -1 for name in names]
+
+        # Decide how the buffer can be demultiplexed
+        spacing = {b - a for a, b in zip(offsets[:-1], offsets[1:])}
+        if not step or min(offsets) < 0 or any(df.repeat != 1 for df in formats):
+            layout = "channels"
+        elif (
+            len(names) > 1
+            and len(spacing) == 1
+            and min(spacing) > 0
+            and len(set(dtypes)) == 1
+            and not any(_scan_needs_convert(df) for df in formats)
+        ):
+            layout = "stacked"
+        else:
+            layout = "views"
+
+        if self._complex_data:
+            scale = offset = (False,) * len(self.rx_enabled_channels)
+        else:
+            scale = tuple("scale" in chan.attrs for chan in channels)
+            offset = tuple("offset" in chan.attrs for chan in channels)
+
+        return rx_plan(
+            buffer=self.__rxbuf,
+            enabled_channels=tuple(self.rx_enabled_channels),
+            buffer_size=self.__rx_buffer_size,
+            names=tuple(names),
+            channels=tuple(channels),
+            formats=tuple(formats),
+            dtypes=tuple(dtypes),
+            offsets=tuple(offsets),
+            step=step,
+            scale=scale,
+            offset=offset,
+            layout=layout,
+        )
 
     def _rx_init_channels(self):
+        # Release a stale buffer before reconfiguring, channels cannot be
+        # toggled and a second buffer cannot be opened while it exists. The
+        # plan and cached outputs reference it too
+        self.__rxbuf = None
+        self.__rx_plan = None
+        self.__rx_out = None
         for m in self._rx_channel_names:
             v = self._rxadc.find_channel(m)
             if not v:
@@ -224,33 +817,113 @@ class rx(rx_tx_common):
                 v = self._rxadc.find_channel(self._rx_channel_names[m])
                 v.enabled = True
         self.__rxbuf = iio.Buffer(self._rxadc, self.__rx_buffer_size, False)
+        self.__rx_plan = self.__rx_build_plan()
 
-    def __rx_unbuffered_data(self):
-        x = []
-        t = (
-            self._rx_data_si_type
-            if self._rx_output_type == "SI"
-            else self._rx_data_type
+    @property
+    def rx_poll_stats(self) -> rx_poll_info:
+        """rx_poll_stats: Timing statistics of the last polled capture of an
+        unbuffered device"""
+        return self.__rx_poll_stats
+
+    def __rx_poll_readers(self):
+        read = getattr(iio, "_c_read_attr", None)
+        readers = []
+        for m in self.rx_enabled_channels:
+            name = self._rx_channel_names[m]
+            chan = self._rxadc.find_channel(name, False)
+            if not chan:
+                raise Exception("No channel found with name: " + name)
+            readers.append(
+                _attr_reader(chan.attrs["raw"], read, getattr(chan, "_channel", None))
+            )
+        return readers
+
+    def rx_poll(self, rate=None, out=None, timestamps=None):
+        """Capture rx_buffer_size samples from an unbuffered device by
+        polling the raw attribute of each enabled channel.
+
+        The attributes are resolved once per call, each with its own reused
+        read buffer, and read back to back in one sweep per sample. libiio
+        has no request spanning attributes of several channels, so a sweep
+        makes one request per enabled channel. Collected values are parsed in a single
+        vectorized step and a host monotonic timestamp is recorded at the
+        start of each sweep. Timing statistics are available afterwards
+        through rx_poll_stats.
+
+        parameters:
+            rate: type=float
+                Target sweeps per second. Sweeps are paced against a fixed
+                schedule and jitter is measured against it. By default
+                sweeps run back to back
+            out: type=numpy.ndarray
+                Preallocated array of shape (channels, rx_buffer_size)
+            timestamps: type=numpy.ndarray
+                Preallocated float64 array of length rx_buffer_size
+
+        returns: type=tuple(numpy.ndarray, numpy.ndarray)
+            Samples of shape (channels, rx_buffer_size) and the
+            time.monotonic() value of each sweep
+        """
+        readers = self.__rx_poll_readers()
+        si = self._rx_output_type == "SI"
+        n = self.rx_buffer_size
+        if out is None:
+            t = self._rx_data_si_type if si else self._rx_data_type
+            out = np.empty((len(readers), n), dtype=t)
+        elif out.shape != (len(readers), n):
+            raise ValueError(
+                f"out must have shape {(len(readers), n)}, got {out.shape}"
+            )
+        if timestamps is None:
+            timestamps = np.empty(n)
+        elif timestamps.shape != (n,):
+            raise ValueError(f"timestamps must have shape {(n,)}, got {timestamps.shape}")
+
+        if si:
+            # Read before polling so conversion does not delay the sweeps
+            scale, offset = self.__rx_conversion_coefficients()
+
+        values = [None] * (n * len(readers))
+        late = np.zeros(n)
+        clock = time.monotonic
+        k = 0
+        start = clock()
+        for samp in range(n):
+            now = clock()
+            if rate:
+                deadline = start + samp / rate
+                if deadline > now:
+                    time.sleep(deadline - now)
+                    now = clock()
+                late[samp] = now - deadline
+            timestamps[samp] = now
+            for read in readers:
+                values[k] = read()
+                k += 1
+
+        x = _parse_samples(values).reshape(n, len(readers)).T
+        if si:
+            x *= scale[:, None]
+            x += offset[:, None]
+        np.copyto(out, x, "unsafe")
+
+        duration = timestamps[-1] - timestamps[0]
+        if not rate and n > 1:
+            periods = np.diff(timestamps)
+            late = periods - periods.mean()
+        self.__rx_poll_stats = rx_poll_info(
+            samples=n,
+            duration=float(duration),
+            rate=float((n - 1) / duration) if duration > 0 else 0.0,
+            jitter_mean=float(np.mean(late)),
+            jitter_std=float(np.std(late)),
+            jitter_max=float(np.max(np.abs(late))),
         )
-        for _ in range(len(self.rx_enabled_channels)):
-            x.append(np.zeros(self.rx_buffer_size, dtype=t))
+        return out, timestamps
 
-        # Get scalers first
-        if self._rx_output_type == "SI":
-            rx_scale = self.__get_rx_channel_scales()
-            rx_offset = self.__get_rx_channel_offsets()
-
-        for samp in range(self.rx_buffer_size):
-            for i, m in enumerate(self.rx_enabled_channels):
-                s = self._get_iio_attr(
-                    self._rx_channel_names[m], "raw", False, self._rxadc
-                )
-                if self._rx_output_type == "SI":
-                    x[i][samp] = rx_scale[i] * s + rx_offset[i]
-                else:
-                    x[i][samp] = s
-
-        return x
+    def __rx_unbuffered_data(self):
+        data, _ = self.rx_poll()
+        return list(data)
 
     def __rx_buffered_data(self) -> Union[List[np.ndarray], np.ndarray]:
         """__rx_buffered_data: Read data from RX buffer
@@ -259,52 +932,154 @@ class rx(rx_tx_common):
             List of numpy arrays containing the data from the RX buffer that are
             channel interleaved
         """
-        if not self.__rxbuf:
+        plan = self.rx_capture_plan
+        if not plan:
             self._rx_init_channels()
+            plan = self.__rx_plan
+        timed = instrumentation.active
+        if timed:
+            start = instrumentation.clock()
         self.__rxbuf.refill()
+        if timed:
+            now = instrumentation.clock()
+            instrumentation.emit("rx_refill", self._rxadc.name, "buffer", now - start)
+            start = now
+
+        data = None
+        if self._rx_single_read and plan.layout != "channels":
+            data = self.__rx_read_views(plan)
+        if data is None:
+            data = [
+                np.frombuffer(chan.read(self.__rxbuf), dtype=dt)  # Local type conversion
+                for chan, dt in zip(plan.channels, plan.dtypes)
+            ]
+        if timed:
+            instrumentation.emit(
+                "rx_read", self._rxadc.name, "buffer", instrumentation.clock() - start
+            )
+        return data
 
-        data_channel_interleaved = []
-        ecn = []
-        if self._complex_data:
-            for m in self.rx_enabled_channels:
-                ecn.extend(
-                    (self._rx_channel_names[m * 2], self._rx_channel_names[m * 2 + 1])
-                )
-        else:
-            ecn = [self._rx_channel_names[m] for m in self.rx_enabled_channels]
+    def __rx_read_views(self, plan):
+        """Read the whole buffer once and split it into per channel views.
 
-        for name in ecn:
-            chan = self._rxadc.find_channel(name)
-            bytearray_data = chan.read(self.__rxbuf)  # Do local type conversion
-            # create format strings
-            df = chan.data_format
-            fmt = ("i" if df.is_signed is True else "u") + str(df.length // 8)
-            data_channel_interleaved.append(np.frombuffer(bytearray_data, dtype=fmt))
+        For a stacked plan a single 2-D (channels, samples) view is returned.
+        Returns None when the size of the buffer does not match the plan, in
+        which case channels are read individually.
+        """
+        raw = self.__rxbuf.read()
+        if len(raw) != plan.step * plan.buffer_size:
+            return None
+        if plan.layout == "stacked":
+            return np.ndarray(
+                shape=(len(plan.names), plan.buffer_size),
+                dtype=plan.dtypes[0],
+                buffer=raw,
+                offset=plan.offsets[0],
+                strides=(plan.offsets[1] - plan.offsets[0], plan.step),
+            )
+        return [
+            _scan_convert(_scan_view(raw, o, plan.step, df), df)
+            for o, df in zip(plan.offsets, plan.formats)
+        ]
 
-        return data_channel_interleaved
+    def __rx_stack(self, x):
+        if isinstance(x, np.ndarray) and x.ndim == 2:
+            return x
+        return np.stack(x)
 
-    def __rx_complex(self):
-        x = self.__rx_buffered_data()
+    def __rx_complex(self, x):
         if len(x) % 2 != 0:
             raise Exception(
                 "Complex data must have an even number of component channels"
             )
+        if self._rx_complex_format != "complex128":
+            out = self.__rx_complex_formatted(x)
+            return out[0] if len(x) == 2 else out
+        if self._rx_stacked and len(x) > 2:
+            x = self.__rx_stack(x)
+            return x[0::2] + 1j * x[1::2]
         out = [x[i] + 1j * x[i + 1] for i in range(0, len(x), 2)]
         # Don't return list if a single channel
         return out[0] if len(x) == 2 else out
 
-    def __rx_non_complex(self):
-        x = self.__rx_buffered_data()
+    def __rx_complex_formatted(self, x):
+        """Build complex64, interleaved or structured IQ output. Views of the
+        buffer are returned where the layout allows it, otherwise the data is
+        produced with a single pass over each component channel.
+        """
+        fmt = self._rx_complex_format
+        nchan = len(x) // 2
+        samples = len(x[0])
+        stacked = self._rx_stacked and nchan > 1
+        plan = self.rx_capture_plan
+        is_view = (
+            isinstance(x, np.ndarray)
+            and isinstance(x.base, bytearray)
+            and plan
+            and plan.layout == "stacked"
+        )
+
+        if fmt == "interleaved":
+            if isinstance(x, np.ndarray):
+                out = x.reshape(nchan, 2, samples).transpose(0, 2, 1)
+            else:
+                out = np.empty((nchan, samples, 2), dtype=x[0].dtype)
+                for k in range(nchan):
+                    out[k, :, 0] = x[2 * k]
+                    out[k, :, 1] = x[2 * k + 1]
+            return out if stacked else list(out)
+
+        if fmt == "structured":
+            if is_view:
+                spacing = plan.offsets[1] - plan.offsets[0]
+                dt = np.dtype(
+                    {
+                        "names": ["i", "q"],
+                        "formats": [x.dtype, x.dtype],
+                        "offsets": [0, spacing],
+                        "itemsize": spacing + x.dtype.itemsize,
+                    }
+                )
+                out = np.ndarray(
+                    shape=(nchan, samples),
+                    dtype=dt,
+                    buffer=x.base,
+                    offset=plan.offsets[0],
+                    strides=(2 * spacing, plan.step),
+                )
+            else:
+                dt = np.dtype([("i", x[0].dtype), ("q", x[1].dtype)])
+                out = np.empty((nchan, samples), dtype=dt)
+                for k in range(nchan):
+                    out[k]["i"] = x[2 * k]
+                    out[k]["q"] = x[2 * k + 1]
+            return out if stacked else list(out)
+
+        # complex64
+        out = np.empty((nchan, samples), dtype=np.complex64)
+        pairs = out.view(np.float32).reshape(nchan, samples, 2)
+        if isinstance(x, np.ndarray):
+            np.copyto(pairs, x.reshape(nchan, 2, samples).transpose(0, 2, 1), "unsafe")
+        else:
+            for k in range(nchan):
+                np.copyto(pairs[k, :, 0], x[2 * k], "unsafe")
+                np.copyto(pairs[k, :, 1], x[2 * k + 1], "unsafe")
+        return out if stacked else list(out)
+
+    def __rx_non_complex(self, x):
+        if self._rx_stacked and len(x) > 1:
+            x = self.__rx_stack(x)
         if self._rx_output_type == "SI":
-            rx_scale = self.__get_rx_channel_scales()
-            rx_offset = self.__get_rx_channel_offsets()
-            x = x if isinstance(x, list) else [x]
-            x = [rx_scale[i] * x[i] + rx_offset[i] for i in range(len(x))]
+            x = self.__rx_to_si(x)
         elif self._rx_output_type != "raw":
             raise Exception("_rx_output_type undefined")
 
+        if self._rx_stacked and len(self.rx_enabled_channels) > 1:
+            return x
         # Don't return list if a single channel
-        return x[0] if len(self.rx_enabled_channels) == 1 else x
+        if len(self.rx_enabled_channels) == 1:
+            return x[0]
+        return list(x) if isinstance(x, np.ndarray) else x
 
     def rx(self):
         """Receive data from hardware buffers for each channel index in
@@ -313,21 +1088,232 @@ class rx(rx_tx_common):
         returns: type=numpy.array or list of numpy.array
             An array or list of arrays when more than one receive channel
             is enabled containing samples from a channel or set of channels.
-            Data will be complex when using a complex data device.
+            Data will be complex when using a complex data device. When
+            rx_stacked is set, multiple channels are returned as a single
+            2-D array of shape (channels, samples).
         """
         if self._rx_unbuffered_data:
             data = self.__rx_unbuffered_data()
         else:
+            data = self.__rx_buffered_data()
+            timed = instrumentation.active
+            if timed:
+                start = instrumentation.clock()
             if self._complex_data:
-                data = self.__rx_complex()
+                data = self.__rx_complex(data)
             else:
-                data = self.__rx_non_complex()
+                data = self.__rx_non_complex(data)
+            if timed:
+                instrumentation.emit(
+                    "rx_convert",
+                    self._rxadc.name,
+                    "buffer",
+                    instrumentation.clock() - start,
+                )
         if self._rx_annotated:
-            return self._annotate(
+            timed = instrumentation.active
+            if timed:
+                start = instrumentation.clock()
+            data = self._annotate(
                 data, self._rx_channel_names, self.rx_enabled_channels
             )
+            if timed:
+                instrumentation.emit(
+                    "rx_annotate",
+                    self._rxadc.name,
+                    "buffer",
+                    instrumentation.clock() - start,
+                )
         return data
 
+    async def rx_async(self):
+        """Receive data like rx() without blocking the event loop. Calls are
+        run on a worker thread dedicated to the context of this device.
+        """
+        return await self._run_async(self.rx)
+
+    def __rx_out_rows(self, plan, out):
+        """Split arrays passed to rx_into into one row per enabled channel"""
+        nchans = len(plan.enabled_channels)
+        if isinstance(out, np.ndarray) and out.ndim == 1 and nchans == 1:
+            out = [out]
+        if isinstance(out, np.ndarray) and out.ndim == 2:
+            rows = list(out)
+        elif isinstance(out, (list, tuple)):
+            rows = list(out)
+        else:
+            raise Exception("out must be a 2-D array or a list of arrays")
+        if len(rows) != nchans:
+            raise Exception(f"out must provide {nchans} channels, not {len(rows)}")
+        return rows
+
+    def __rx_validate_out(self, plan, rows):
+        """Check the rows of arrays passed to rx_into against the capture plan.
+
+        Returns scratch arrays for component channels needing conversion.
+        """
+        if self._complex_data:
+            kind = np.complexfloating
+        elif self._rx_output_type == "SI":
+            kind = np.floating
+        else:
+            kind = None
+        for i, row in enumerate(rows):
+            if not isinstance(row, np.ndarray) or row.shape != (plan.buffer_size,):
+                raise Exception(
+                    f"out channel {i} must be an array of {plan.buffer_size} samples"
+                )
+            if kind and not np.issubdtype(row.dtype, kind):
+                raise Exception(f"out channel {i} must be of type {kind.__name__}")
+            if not kind and not np.can_cast(plan.dtypes[i], row.dtype, "same_kind"):
+                raise Exception(f"out channel {i} must hold {plan.dtypes[i]} data")
+
+        return [
+            np.empty(plan.buffer_size, dtype=dt)
+            if plan.layout == "views" and _scan_needs_convert(df)
+            else None
+            for df, dt in zip(plan.formats, plan.dtypes)
+        ]
+
+    def rx_into(self, out):
+        """Receive data from hardware buffers into caller provided arrays.
+        Output arrays are validated once per shape and data type, so that
+        repeated captures into the same or alike arrays do not allocate
+        sample memory.
+
+        parameters:
+            out: type=numpy.array or list of numpy.array
+                A 2-D array of shape (channels, rx_buffer_size), or a list
+                with one array of rx_buffer_size samples per enabled channel.
+                A single array may be passed when one channel is enabled.
+                Arrays must be complex for complex data devices, floating
+                point when rx_output_type is SI, and able to hold the channel
+                data type otherwise.
+
+        returns: type=numpy.array or list of numpy.array
+            out, filled with samples from the enabled channels
+        """
+        if self._rx_unbuffered_data:
+            raise Exception("rx_into is only supported for buffered devices")
+        plan = self.rx_capture_plan
+        if not plan:
+            self._rx_init_channels()
+            plan = self.__rx_plan
+        rows = self.__rx_out_rows(plan, out)
+        layout = [
+            (row.shape, row.dtype) if isinstance(row, np.ndarray) else None
+            for row in rows
+        ]
+        cached = self.__rx_out
+        if not cached or cached[0] is not plan or cached[1] != layout:
+            cached = (plan, layout, self.__rx_validate_out(plan, rows))
+            self.__rx_out = cached
+        scratch = cached[2]
+
+        self.__rxbuf.refill()
+        raw = _buffer_memory(self.__rxbuf) if plan.layout != "channels" else None
+        if raw is None or len(raw) != plan.step * plan.buffer_size:
+            comps = [
+                np.frombuffer(chan.read(self.__rxbuf), dtype=dt)
+                for chan, dt in zip(plan.channels, plan.dtypes)
+            ]
+        else:
+            comps = [
+                _scan_convert(_scan_view(raw, o, plan.step, df), df, tmp)
+                if tmp is not None
+                else _scan_view(raw, o, plan.step, df)
+                for o, df, tmp in zip(plan.offsets, plan.formats, scratch)
+            ]
+
+        if self._complex_data:
+            for i, row in enumerate(rows):
+                np.copyto(row.real, comps[2 * i], "unsafe")
+                np.copyto(row.imag, comps[2 * i + 1], "unsafe")
+        elif self._rx_output_type == "SI":
+            self.__rx_to_si(comps, rows)
+        else:
+            for row, comp in zip(rows, comps):
+                np.copyto(row, comp, "unsafe")
+        return out
+
+    def __rx_stream_dtype(self, plan):
+        if self._complex_data:
+            if self._rx_complex_format == "complex128":
+                return np.complex128
+            return np.complex64
+        if self._rx_output_type == "SI":
+            return self._rx_si_dtype
+        return np.result_type(*plan.dtypes)
+
+    def __rx_overflowed(self):
+        """Check and clear the overflow flag of the ADC DMA core"""
+        status = self._rxadc.reg_read(0x80000088)
+        if status & 4:
+            self._rxadc.reg_write(0x80000088, status)
+            return True
+        return False
+
+    def rx_stream(
+        self,
+        queue_depth=4,
+        kernel_buffers=None,
+        drop_policy="oldest",
+        blocks=None,
+        check_overflow=True,
+    ):
+        """Continuously receive data, refilling buffers on a background thread.
+
+        A worker thread refills the hardware buffer and converts each capture
+        into a ring of preallocated (channels, rx_buffer_size) arrays while
+        the caller processes previously captured blocks. Each yielded array
+        is reused once the next block is requested, so it must be copied to
+        be kept. No other buffer methods may be used while streaming.
+        Arguments are checked and the buffer is created when called, while
+        capturing starts once the generator is first iterated.
+
+        parameters:
+            queue_depth: type=int
+                Number of captured blocks that may wait to be consumed
+            kernel_buffers: type=int
+                Number of kernel buffers used by the DMA. When set the RX
+                buffer is recreated with this number of kernel buffers
+            drop_policy: type=string
+                Behavior when the queue is full. Options are:
+                oldest: Discard the oldest waiting block (default)
+                newest: Discard the block just captured
+                block: Stop refilling until a block is consumed
+            blocks: type=int
+                Number of blocks to capture before stopping, including any
+                dropped blocks. Unlimited if None
+            check_overflow: type=bool
+                Read the overflow flag of the DMA core after each refill
+
+        returns: type=generator
+            Tuples of (data, rx_block_info) for each captured block
+        """
+        if drop_policy not in ["oldest", "newest", "block"]:
+            raise ValueError(
+                f"Invalid drop_policy: {drop_policy}. Must be oldest, newest or block"
+            )
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
+        if kernel_buffers:
+            self._rxadc.set_kernel_buffers_count(kernel_buffers)
+            self.rx_destroy_buffer()
+        if not self.rx_capture_plan:
+            self._rx_init_channels()
+        plan = self.rx_capture_plan
+
+        shape = (len(plan.enabled_channels), plan.buffer_size)
+        return _rx_ring.stream(
+            self.rx_into,
+            self.__rx_overflowed if check_overflow else None,
+            np.empty(shape, dtype=self.__rx_stream_dtype(plan)),
+            queue_depth,
+            drop_policy,
+            blocks,
+        )
+
 
 class tx(dds, rx_tx_common):
     """Buffer handling for transmit devices"""
@@ -339,6 +1325,8 @@ class tx(dds, rx_tx_common):
     __txbuf = None
     _output_byte_filename = "out.bin"
     _push_to_file = False
+    __tx_staging = None
+    __tx_scratch = None
 
     def __init__(self, tx_cyclic_buffer=False):
         if self._complex_data:
@@ -435,6 +1423,8 @@ class tx(dds, rx_tx_common):
     def tx_destroy_buffer(self):
         """tx_destroy_buffer: Clears TX buffer"""
         self.__txbuf = None
+        # Destroying the buffer hands the DAC back to the DDSs
+        self.dds_invalidate()
 
     def _tx_init_channels(self):
         if self._complex_data:
@@ -458,7 +1448,10 @@ class tx(dds, rx_tx_common):
         args: type=numpy.array or list of numpy.array
             An array or list of arrays when more than one transmit channel
             is enabled containing samples from a channel or set of channels.
-            Data must be complex when using a complex data device.
+            Data must be complex when using a complex data device. For
+            complex devices each channel may also be given as interleaved IQ
+            pairs of shape (samples, 2) or a structured array with fields i
+            and q, matching the formats of rx_complex_format.
         """
         if not self.__tx_enabled_channels and data_np:
             raise Exception(
@@ -470,6 +1463,7 @@ class tx(dds, rx_tx_common):
             for chan in self._txdac.channels:
                 if chan.output:
                     chan.attrs["raw"].value = "0"
+                    self.dds_invalidate()
                     return
             raise Exception("No DDS channels found for TX, TX zeroing does not apply")
 
@@ -479,55 +1473,129 @@ class tx(dds, rx_tx_common):
                 "To push more data the tx buffer must be destroyed first."
             )
 
-        if self._complex_data:
-            if self._num_tx_channels_enabled == 1:
-                data_np = [data_np]
-
-            if len(data_np) != self._num_tx_channels_enabled:
-                raise Exception("Not enough data provided for channel mapping")
-
-            indx = 0
-            stride = self._num_tx_channels_enabled * 2
-            data = np.empty(stride * len(data_np[0]), dtype=np.int16)
-            for chan in data_np:
-                i = np.real(chan)
-                q = np.imag(chan)
-                data[indx::stride] = i.astype(int)
-                data[indx + 1 :: stride] = q.astype(int)
-                indx = indx + 2
-        else:
-            if self._num_tx_channels_enabled == 1:
-                data_np = [data_np]
+        if self._num_tx_channels_enabled == 1:
+            data_np = [data_np]
 
-            if len(data_np) != self._num_tx_channels_enabled:
-                raise Exception("Not enough data provided for channel mapping")
+        if len(data_np) != self._num_tx_channels_enabled:
+            raise Exception("Not enough data provided for channel mapping")
 
-            indx = 0
-            stride = self._num_tx_channels_enabled
-            data = np.empty(stride * len(data_np[0]), dtype=np.int16)
-            for chan in data_np:
-                data[indx::stride] = chan.astype(int)
-                indx = indx + 1
+        # Component sources in buffer order, I and Q for complex devices
+        if self._complex_data:
+            sources = [c for chan in data_np for c in _iq_components(chan)]
+        else:
+            sources = [np.asarray(chan) for chan in data_np]
+        stride = len(sources)
+        samples = len(sources[0])
 
         if not self.__txbuf:
             self.disable_dds()
-            self._tx_buffer_size = len(data) // stride
+            self._tx_buffer_size = samples
             self._tx_init_channels()
 
-        if len(data) // stride != self._tx_buffer_size:
+        if samples != self._tx_buffer_size:
             raise Exception(
                 "Buffer length different than data length. "
                 "Cannot change buffer length on the fly"
             )
 
-        # Send data to buffer
+        data, staged = self.__tx_memory(stride * samples * 2)
+
+        start = instrumentation.clock() if instrumentation.active else None
+        interleaved = data.view(np.int16)
+        for indx, src in enumerate(sources):
+            self.__tx_saturate(src, interleaved[indx::stride])
+        self.__tx_send(data, staged, start)
+
+    def __tx_memory(self, size):
+        """Memory to interleave samples into, the buffer itself when it is
+        accessible and otherwise a reused staging array. Returns the memory
+        and whether it must be written to the buffer"""
+        if not self._push_to_file:
+            data = _buffer_memory(self.__txbuf)
+            if data is not None and len(data) == size:
+                return data, False
+        data = self.__tx_staging
+        if data is None or len(data) != size:
+            data = np.empty(size, dtype=np.uint8)
+            self.__tx_staging = data
+        return data, True
+
+    def __tx_send(self, data, staged, start):
+        """Send interleaved data to the output file or push it to hardware.
+        start is the instrumentation clock when interleaving began, or None
+        when not timed"""
         if self._push_to_file:
             f = open(self._output_byte_filename, "ab")
-            f.write(bytearray(data))
+            f.write(data)
             f.close()
-        else:
-            self.__txbuf.write(bytearray(data))
-            self.__txbuf.push()
+            return
+        if staged:
+            self.__txbuf.write(data)
+        if start is not None:
+            now = instrumentation.clock()
+            instrumentation.emit("tx_write", self._txdac.name, "buffer", now - start)
+            start = now
+        self.__txbuf.push()
+        if start is not None:
+            instrumentation.emit(
+                "tx_push", self._txdac.name, "buffer", instrumentation.clock() - start
+            )
+
+    async def tx_async(self, data_np=None):
+        """Transmit data like tx() without blocking the event loop. Calls are
+        run on a worker thread dedicated to the context of this device.
+        """
+        await self._run_async(self.tx, data_np)
+
+    def tx_stream(
+        self, source, kernel_buffers=None, queue_depth=4, check_underflow=True
+    ):
+        """Continuously transmit blocks of data with non-cyclic buffers.
+
+        Blocks are pushed by a background thread while the source keeps
+        producing them. No other buffer methods may be used while streaming.
+
+        parameters:
+            source: type=iterable, queue.Queue or callable
+                Blocks of data in any form accepted by tx(). Either an
+                iterable of blocks, a queue.Queue where None ends the stream,
+                or a callback called with the block index which returns the
+                next block or None to end the stream
+            kernel_buffers: type=int
+                Number of kernel buffers used by the DMA. When set the TX
+                buffer is recreated with this number of kernel buffers
+            queue_depth: type=int
+                Number of produced blocks that may wait to be pushed
+            check_underflow: type=bool
+                Read the underflow flag of the DMA core after each push
+
+        returns: type=adi.rx_tx.tx_streamer
+            Handle to monitor and stop the stream
+        """
+        if self.tx_cyclic_buffer:
+            raise Exception("tx_stream requires tx_cyclic_buffer to be False")
+        if kernel_buffers:
+            self._txdac.set_kernel_buffers_count(kernel_buffers)
+            self.tx_destroy_buffer()
+        return tx_streamer(self, source, queue_depth, check_underflow, 1024)
+
+    def __tx_saturate(self, src, dst):
+        """Round and saturate a channel into its int16 slots of the buffer,
+        using a reusable scratch array for floating point sources"""
+        if src.dtype == np.int16:
+            np.copyto(dst, src)
+            return
+        if not np.issubdtype(src.dtype, np.floating):
+            np.clip(src, -32768, 32767, out=dst, casting="unsafe")
+            return
+        if self.__tx_scratch is None:
+            self.__tx_scratch = {}
+        scratch = self.__tx_scratch.get(src.dtype)
+        if scratch is None or len(scratch) != len(src):
+            scratch = np.empty(len(src), dtype=src.dtype)
+            self.__tx_scratch[src.dtype] = scratch
+        np.clip(src, -32768, 32767, out=scratch)
+        np.rint(scratch, out=dst, casting="unsafe")
 
 
 class rx_tx(rx, tx, phy):
@@ -615,16 +1683,10 @@ class shared_def(context_manager, metaclass=ABCMeta):
             context_manager.__init__(self, uri_ctx, self._device_name)
         else:
             required_devices = [self._rx_data_device_name, self._control_device_name]
-            contexts = iio.scan_contexts()
-            self._ctx = None
-            for c in contexts:
-                ctx = iio.Context(c)
-                devs = [dev.name for dev in ctx.devices]
-                if all(dev in devs for dev in required_devices):
-                    self._ctx = iio.Context(c)
-                    break
-            if not self._ctx:
+            uri = discovery.find(devices=[d for d in required_devices if d])
+            if not uri:
                 raise Exception("No context could be found for class")
+            context_manager.__init__(self, uri, self._device_name)
 
         # Set up devices
         if self._control_device_name:
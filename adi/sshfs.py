@@ -33,8 +33,6 @@
 
 from contextlib import suppress
 
-import paramiko
-
 
 class sshfs:
     """Minimal sshfs replacement"""
@@ -45,6 +43,10 @@ class sshfs:
         self.address = address
         self.username = username
         self.password = password
+
+        # paramiko is slow to import, only pay for it once a link is opened
+        import paramiko
+
         self.ssh = paramiko.SSHClient()
 
         self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy)
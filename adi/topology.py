@@ -0,0 +1,137 @@
+# Copyright (C) 2022 Analog Devices, Inc.
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#     - Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     - Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in
+#       the documentation and/or other materials provided with the
+#       distribution.
+#     - Neither the name of Analog Devices, Inc. nor the names of its
+#       contributors may be used to endorse or promote products derived
+#       from this software without specific prior written permission.
+#     - The use of this software may or may not infringe the patent rights
+#       of one or more patent holders.  This license does not release you
+#       from the requirement that you obtain separate licenses from these
+#       patent holders to use this software.
+#     - Use of the software either in source or binary form, must be run
+#       on or directly connected to an Analog Devices Inc. component.
+#
+# THIS SOFTWARE IS PROVIDED BY ANALOG DEVICES "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, NON-INFRINGEMENT, MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED.
+#
+# IN NO EVENT SHALL ANALOG DEVICES BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, INTELLECTUAL PROPERTY
+# RIGHTS, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF
+# THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""On-disk cache of derived device topology
+
+Drivers which enumerate channels and read labels to work out how a board is
+wired can store the result here, keyed by a hash of the context XML
+description together with the driver name and its arguments. Constructing
+the same driver against an unchanged context then reuses the stored
+topology instead of enumerating it again. The XML is downloaded when the
+context is created, so the key costs no extra I/O.
+
+The cache is disabled by default. Labels are attribute values, which are
+not part of the XML description, so enable it only for targets whose device
+tree does not change without a change of firmware or kernel.
+"""
+
+import hashlib
+import json
+import os
+
+from adi.discovery import cache_dir
+
+# Use and update cached topologies
+enabled = False
+
+
+def _cache_dir():
+    return os.path.join(cache_dir(), "topology")
+
+
+def context_key(ctx):
+    """Hash identifying the layout of a context
+
+    The XML description is used when available. Otherwise the board serial
+    and firmware version from the context attributes identify the target.
+    """
+    xml = getattr(ctx, "xml", None)
+    if not xml:
+        attrs = ctx.attrs
+        xml = "\n".join(
+            str(attrs.get(name))
+            for name in ["hw_serial", "fw_version", "local,kernel", "uri"]
+        )
+    return hashlib.sha1(xml.encode()).hexdigest()
+
+
+def _file(ctx, driver, args):
+    key = hashlib.sha1(
+        json.dumps([context_key(ctx), driver, args]).encode()
+    ).hexdigest()
+    return os.path.join(_cache_dir(), key + ".json")
+
+
+def load(ctx, driver, *args):
+    """Get the cached topology of a driver for a context
+
+    parameters:
+        ctx: type=iio.Context
+            Context the driver is constructed against
+        driver: type=string
+            Name of the driver storing the topology
+        args:
+            JSON serializable arguments the topology depends on
+
+    returns: type=dict
+        Topology previously given to save, or None when not cached
+    """
+    if not enabled:
+        return None
+    try:
+        with open(_file(ctx, driver, list(args))) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(ctx, driver, topology, *args):
+    """Cache the topology of a driver for a context
+
+    topology must be JSON serializable. Errors writing the cache are
+    ignored.
+    """
+    if not enabled:
+        return
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        path = _file(ctx, driver, list(args))
+        tmp = path + ".{}".format(os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(topology, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def invalidate():
+    """Remove all cached topologies"""
+    try:
+        names = os.listdir(_cache_dir())
+    except OSError:
+        return
+    for name in names:
+        try:
+            os.remove(os.path.join(_cache_dir(), name))
+        except OSError:
+            pass
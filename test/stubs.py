@@ -0,0 +1,91 @@
+"""Stand-ins for IIO devices used by tests which run without hardware"""
+
+
+class data_format:
+    def __init__(self, length=16, bits=16, shift=0, is_signed=True, is_be=False):
+        self.length = length
+        self.bits = bits
+        self.shift = shift
+        self.is_signed = is_signed
+        self.is_be = is_be
+        self.repeat = 1
+
+
+class attr:
+    """Attribute recording the values written to it in log"""
+
+    def __init__(self, value, log=None):
+        self._value = str(value)
+        self.log = [] if log is None else log
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.log.append(value)
+        self._value = value
+
+
+def attrs(values, writes=None):
+    """Attributes with the given values, logging their writes to writes"""
+    if writes is not None:
+        writes.update({name: [] for name in values})
+    return {
+        name: attr(value, None if writes is None else writes[name])
+        for name, value in values.items()
+    }
+
+
+class channel:
+    def __init__(
+        self,
+        id,
+        index=0,
+        df=None,
+        output=False,
+        enabled=True,
+        scan=True,
+        attrs=None,
+    ):
+        self.id = id
+        self.name = None
+        self.index = index
+        self.data_format = df or data_format()
+        self.output = output
+        self.enabled = enabled
+        self.scan_element = scan
+        self.attrs = attrs or {}
+
+
+class device:
+    """Device whose attribute writes are recorded in writes, keyed by
+    attribute name for device attributes and by (channel, attribute) for
+    channel attributes"""
+
+    def __init__(self, name="stub", channels=(), uri="local:", **values):
+        self.name = name
+        self.id = name
+        self.uri = uri
+        self._ctx = object()
+        self.channels = list(channels)
+        self.writes = {}
+        self.attrs = attrs(values, self.writes)
+        self.debug_attrs = {}
+        for chan in self.channels:
+            for attr_name, a in chan.attrs.items():
+                self.writes[(chan.id, attr_name)] = a.log
+
+    def find_channel(self, name, output=False):
+        for chan in self.channels:
+            if chan.id == name and chan.output == output:
+                return chan
+        return None
+
+
+class context:
+    def __init__(self, devices=(), xml=None, **attrs):
+        self.devices = list(devices)
+        self.xml = xml
+        self.attrs = attrs
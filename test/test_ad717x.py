@@ -1,4 +1,6 @@
+import adi
 import pytest
+from adi import topology
 
 hardware = "ad4111"
 classname = "adi.ad717x"
@@ -9,3 +11,14 @@ classname = "adi.ad717x"
 @pytest.mark.parametrize("classname", [(classname)])
 def test_ad717x_rx_data(test_dma_rx, iio_uri, classname, channel):
     test_dma_rx(iio_uri, classname, channel)
+
+
+@pytest.mark.iio_hardware(hardware)
+def test_ad717x_topology_cache(iio_uri, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(topology, "enabled", True)
+    dev = adi.ad717x(iio_uri)
+    assert list((tmp_path / "pyadi-iio" / "topology").iterdir())
+    cached = adi.ad717x(iio_uri)
+    assert cached._rx_channel_names == dev._rx_channel_names
+    assert cached._ctrl.name == dev._ctrl.name
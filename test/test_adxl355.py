@@ -1,3 +1,5 @@
+import adi
+import numpy as np
 import pytest
 
 hardware = "adxl355"
@@ -37,3 +39,18 @@ def test_adxrs355_attr(
     test_attribute_single_value(
         iio_uri, classname, attr, start, stop, step, tol, repeats, sub_channel
     )
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware)
+def test_adxl355_rx_poll(iio_uri):
+    dev = adi.adxl355(uri=iio_uri)
+    dev.rx_enabled_channels = [0, 1, 2]
+    dev.rx_buffer_size = 2 ** 6
+    out = np.zeros((3, 2 ** 6))
+    timestamps = np.zeros(2 ** 6)
+    data, ts = dev.rx_poll(rate=100, out=out, timestamps=timestamps)
+    assert data is out and ts is timestamps
+    assert np.all(np.diff(ts) > 0)
+    assert dev.rx_poll_stats.samples == 2 ** 6
+    assert dev.rx_poll_stats.rate < 110
@@ -0,0 +1,99 @@
+from test.stubs import attrs, channel, context, device
+
+import pytest
+from adi.attribute import _same_value, attribute, get_numbers
+
+
+class part(attribute):
+    def __init__(self, dev):
+        self._ctrl = dev
+
+
+@pytest.mark.parametrize(
+    "s, expected",
+    [
+        ("42", 42),
+        ("-7", -7),
+        ("2.5", 2.5),
+        ("1e3", 1000),
+        ("1000000000.000000", 1000000000),
+        ("[0 1 2]", [0.0, 1.0, 2.0]),
+        ("2400000000 Hz", 2400000000),
+        ("-3.25 dB", -3.25),
+        ("1_000", [1.0, 0.0]),
+    ],
+)
+def test_get_numbers(s, expected):
+    v = get_numbers(s)
+    assert v == expected
+    assert type(v) is type(expected)
+
+
+@pytest.mark.parametrize(
+    "a, b, same",
+    [
+        ("10", "10.000000", True),
+        ("-0.5", "-5e-1", True),
+        ("1 2", "12", False),
+        ("slow_attack_1", "fast_attack_1", False),
+        ("10 dB", "10", False),
+        ("fdd", "fdd", True),
+    ],
+)
+def test_same_value(a, b, same):
+    assert _same_value(a, b) is same
+
+
+def test_batch_coalesces_writes():
+    dev = device(a="0", b="0")
+    obj = part(dev)
+    with obj.batch() as batch:
+        obj._set_iio_dev_attr("a", 1)
+        obj._set_iio_dev_attr("a", 2)
+        obj._set_iio_dev_attr("b", 5)
+        # Reads of pending writes see the pending value, nothing is written
+        assert obj._get_iio_dev_attr("a") == 2
+        assert dev.writes == {"a": [], "b": []}
+    assert dev.writes == {"a": ["2"], "b": ["5"]}
+    assert (batch.written, batch.coalesced, batch.skipped) == (2, 1, 0)
+
+
+def test_batch_skips_known_values():
+    dev = device(a="3", mode="slow_attack")
+    obj = part(dev)
+    with obj.batch() as batch:
+        assert obj._get_iio_dev_attr("a") == 3
+        assert obj._get_iio_dev_attr_str("mode") == "slow_attack"
+        obj._set_iio_dev_attr("a", 3.0)
+        obj._set_iio_dev_attr_str("mode", "fast_attack")
+    assert dev.writes == {"a": [], "mode": ["fast_attack"]}
+    assert batch.skipped == 1
+
+
+def test_batch_discarded_on_error():
+    dev = device(a="0")
+    obj = part(dev)
+    with pytest.raises(RuntimeError):
+        with obj.batch():
+            obj._set_iio_dev_attr("a", 1)
+            raise RuntimeError
+    assert dev.writes == {"a": []}
+
+
+def test_restore_reports_missing_entries():
+    dev = device(
+        "phy",
+        [channel("voltage0", attrs=attrs({"hardwaregain": "1"}))],
+        mode="a",
+    )
+    obj = part(dev)
+    obj._ctx = context([dev])
+    snap = obj.snapshot()
+    snap["devices"]["phy"]["attrs"].update(mode="b", gone="1")
+    snap["devices"]["phy"]["channels"]["in_voltage0"]["hardwaregain"] = "2"
+    snap["devices"]["phy"]["channels"]["in_voltage9"] = {"hardwaregain": "3"}
+    report = obj.restore(snap)
+    assert report.written == ["phy/mode", "phy/voltage0/hardwaregain"]
+    assert sorted(report.failed) == ["phy/gone", "phy/voltage9/hardwaregain"]
+    assert dev.writes["mode"] == ["b"]
+    assert dev.writes[("voltage0", "hardwaregain")] == ["2"]
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+from adi.fan_out import fan_out, fan_out_error
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_fan_out_results_in_order():
+    tasks = [(i, i % 3, lambda i=i: i * 2) for i in range(10)]
+    assert fan_out(tasks) == [i * 2 for i in range(10)]
+
+
+def test_fan_out_serializes_context():
+    # Operations of one context never overlap, different contexts do
+    active = {}
+    overlap = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def op(ctx):
+        with lock:
+            active[ctx] = active.get(ctx, 0) + 1
+            overlap.append(active[ctx])
+        barrier.wait()
+        with lock:
+            active[ctx] -= 1
+
+    tasks = [(k, ctx, lambda ctx=ctx: op(ctx)) for k, ctx in enumerate("abab")]
+    fan_out(tasks)
+    assert max(overlap) == 1
+
+
+def test_fan_out_single_error_is_raised_as_is():
+    tasks = [(0, "a", lambda: 1), (1, "b", lambda: fail("b"))]
+    with pytest.raises(ValueError, match="b"):
+        fan_out(tasks)
+
+
+def test_fan_out_single_lane_raises_first():
+    done = []
+    tasks = [
+        (0, "a", lambda: fail("first")),
+        (1, "a", lambda: done.append(1)),
+    ]
+    with pytest.raises(ValueError, match="first"):
+        fan_out(tasks)
+    assert done == []
+
+
+def test_fan_out_errors_aggregated_by_key():
+    done = []
+    tasks = [
+        (("uri:a", "dev"), "a", lambda: fail("a")),
+        (("uri:b", "dev"), "b", lambda: done.append(1)),
+        (("uri:c", "dev"), "c", lambda: fail("c")),
+    ]
+    with pytest.raises(fan_out_error) as excinfo:
+        fan_out(tasks)
+    errors = excinfo.value.errors
+    assert list(errors) == [("uri:a", "dev"), ("uri:c", "dev")]
+    assert str(errors[("uri:c", "dev")]) == "c"
+    assert done == [1]
@@ -1,6 +1,9 @@
+import asyncio
+
 import iio
 
 import adi
+import numpy as np
 import pytest
 
 hardware = ["pluto", "adrv9361", "fmcomms2"]
@@ -103,3 +106,259 @@ def test_generic_rx_with_ctx_pv(iio_uri):
     assert dev._rxadc
     assert dev._txdac
     assert dev._ctrl
+
+
+#########################################
+@pytest.mark.iio_hardware(["adrv9361", "fmcomms2"], True)
+def test_generic_rx_single_read(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_buffer_size = 2 ** 12
+    dev.rx_single_read = True
+    data = dev.rx()
+    assert dev.rx_capture_plan
+    assert dev.rx_capture_plan.names == (
+        "voltage0",
+        "voltage1",
+        "voltage2",
+        "voltage3",
+    )
+    assert len(data) == 2
+    for chan in data:
+        assert len(chan) == 2 ** 12
+        assert np.iscomplexobj(chan)
+
+    dev.rx_stacked = True
+    data = dev.rx()
+    assert isinstance(data, np.ndarray)
+    assert data.shape == (2, 2 ** 12)
+
+
+#########################################
+@pytest.mark.iio_hardware(["adrv9361", "fmcomms2"], True)
+def test_generic_rx_si_cached(iio_uri):
+    class MyAD9361(adi.rx_tx.rx_def):
+        _complex_data = False
+        _control_device_name = "ad9361-phy"
+        _rx_data_device_name = "cf-ad9361-lpc"
+
+        def __post_init__(self):
+            pass
+
+    dev = MyAD9361(iio_uri)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_output_type = "SI"
+    dev.rx_si_dtype = np.float32
+    for _ in range(2):
+        data = dev.rx()
+        assert all(chan.dtype == np.float32 for chan in data)
+    dev.refresh_conversion()
+    data = dev.rx()
+    assert all(chan.dtype == np.float32 for chan in data)
+
+
+#########################################
+@pytest.mark.iio_hardware(["adrv9361", "fmcomms2"], True)
+def test_generic_rx_into(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_buffer_size = 2 ** 12
+    out = np.zeros((2, 2 ** 12), dtype=np.complex64)
+    for _ in range(3):
+        assert dev.rx_into(out) is out
+    assert np.max(np.abs(out)) > 0
+
+    with pytest.raises(Exception):
+        dev.rx_into(np.zeros((2, 2 ** 10), dtype=np.complex64))
+
+
+#########################################
+@pytest.mark.iio_hardware(["adrv9361", "fmcomms2"], True)
+@pytest.mark.parametrize(
+    "complex_format, check",
+    [
+        ("complex64", lambda d: d.dtype == np.complex64),
+        ("interleaved", lambda d: d.shape == (2 ** 12, 2)),
+        ("structured", lambda d: d.dtype.names == ("i", "q")),
+    ],
+)
+def test_generic_rx_complex_format(iio_uri, complex_format, check):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_enabled_channels = [0]
+    dev.rx_buffer_size = 2 ** 12
+    dev.rx_single_read = True
+    dev.rx_complex_format = complex_format
+    data = dev.rx()
+    assert check(data)
+
+    dev.tx_enabled_channels = [0]
+    dev.tx_cyclic_buffer = True
+    dev.tx(data)
+    dev.tx_destroy_buffer()
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+@pytest.mark.parametrize("drop_policy", ["oldest", "newest", "block"])
+def test_generic_rx_stream(iio_uri, drop_policy):
+    dev = adi.Pluto(uri=iio_uri)
+    dev.rx_buffer_size = 2 ** 14
+    sequence = -1
+    for data, info in dev.rx_stream(
+        queue_depth=2, kernel_buffers=4, drop_policy=drop_policy, blocks=10
+    ):
+        assert data.shape == (1, 2 ** 14)
+        assert info.sequence > sequence
+        sequence = info.sequence
+    assert sequence == 9 or drop_policy != "block"
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_tx_stream(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    n = np.arange(2 ** 14)
+    blocks = [np.exp(2j * np.pi * 0.01 * n) * 2 ** 14] * 10
+    stream = dev.tx_stream(blocks, kernel_buffers=4)
+    stream.join()
+    assert stream.pushed == 10
+    assert len(stream.push_latencies) == 10
+    dev.tx_destroy_buffer()
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_async(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+
+    async def capture():
+        await dev.set_attr_async("rx_buffer_size", 2 ** 12)
+        size = await dev.get_attr_async("rx_buffer_size")
+        return size, await asyncio.gather(dev.rx_async(), dev.rx_async())
+
+    size, (data1, data2) = asyncio.run(capture())
+    assert size == 2 ** 12
+    assert len(data1) == len(data2) == 2 ** 12
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_attr_cache(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    cache = dev.enable_attr_cache(ttl=None)
+    lo = dev.rx_lo
+    assert dev.rx_lo == lo
+    assert cache.hits > 0
+    dev.rx_lo = lo + 1000000
+    assert dev.rx_lo == lo + 1000000
+    dev.rx_lo = lo
+    dev.disable_attr_cache()
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_attr_batch(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    lo = dev.rx_lo
+    with dev.batch() as batch:
+        dev.rx_lo = lo + 1000000
+        dev.rx_lo = lo + 2000000
+        assert dev.rx_lo == lo + 2000000
+        dev.gain_control_mode_chan0 = dev.gain_control_mode_chan0
+    assert batch.coalesced == 1
+    assert batch.skipped == 1
+    assert dev.rx_lo == lo + 2000000
+    dev.rx_lo = lo
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_snapshot_restore(iio_uri, tmp_path):
+    dev = adi.Pluto(uri=iio_uri)
+    lo = dev.rx_lo
+    filename = str(tmp_path / "snapshot.json.gz")
+    dev.snapshot(filename)
+    dev.rx_lo = lo + 1000000
+    report = dev.restore(filename)
+    assert dev.rx_lo == lo
+    assert report.written
+    assert not dev.restore(filename).written
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_attr_schema(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    assert isinstance(dev.rx_lo, int)
+    assert isinstance(dev.tx_hardwaregain_chan0, float)
+    with pytest.raises(ValueError):
+        dev.rx_lo = 1
+    with pytest.raises(ValueError):
+        dev.gain_control_mode_chan0 = "unknown"
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_instrumentation(iio_uri):
+    from adi import instrumentation
+
+    dev = adi.Pluto(uri=iio_uri)
+    events = []
+    instrumentation.add_sink(events.append)
+    with instrumentation.profile() as stats:
+        dev.rx_lo
+        dev.rx()
+    instrumentation.remove_sink(events.append)
+    assert not instrumentation.active
+    kinds = {event.kind for event in events}
+    assert {"attr_read", "rx_refill", "rx_read", "rx_convert"} <= kinds
+    assert sum(s["count"] for s in stats.summary().values()) == len(events)
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_shared_context(iio_uri):
+    from adi.context_manager import pool
+
+    pool.enabled = True
+    try:
+        dev1 = adi.Pluto(uri=iio_uri)
+        dev2 = adi.Pluto(uri=iio_uri)
+    finally:
+        pool.enabled = False
+    assert dev1.ctx is dev2.ctx
+    references = pool.references(iio_uri)
+    dev2.close()
+    assert dev2.ctx is None
+    assert pool.references(iio_uri) == references - 1
+    assert dev1.rx_lo
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_dds_configure(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    dev.dds_configure({0: [(1000000, 0.5), (-2000000, 0.25)]})
+    freqs = [float(f) for f in dev.dds_frequencies]
+    scales = [float(s) for s in dev.dds_scales]
+    assert sorted(freqs) == pytest.approx([1e6, 1e6, 2e6, 2e6], rel=1e-3)
+    assert sorted(scales) == pytest.approx([0.25, 0.25, 0.5, 0.5], abs=1e-3)
+    # Retuning with unchanged scales only touches frequencies
+    dev.dds_configure({0: [(1500000, 0.5), (-2000000, 0.25)]})
+    assert min(float(f) for f in dev.dds_frequencies) == pytest.approx(
+        1.5e6, rel=1e-3
+    )
+    dev.disable_dds()
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_dds_sweep(iio_uri):
+    dev = adi.Pluto(uri=iio_uri)
+    dev.rx_buffer_size = 2 ** 12
+    freqs = np.linspace(1e5, 1e6, 8)
+    result = dev.dds_sweep(freqs, 0.5, interval=0.01, capture=True, discard=1)
+    assert result.data.shape == (len(freqs), 2 ** 12)
+    assert np.all(np.diff(result.timestamps) >= 0.009)
+    assert float(dev.dds_frequencies[0]) == pytest.approx(freqs[-1], rel=1e-3)
+    dev.disable_dds()
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+
+import adi
+import pytest
+
+probe = """
+import json, sys
+import adi
+heavy = ["numpy", "iio", "paramiko", "ad9361"]
+print(json.dumps([m for m in heavy if m in sys.modules]))
+"""
+
+
+def import_adi():
+    out = subprocess.run(
+        [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def test_import_no_heavy_dependencies():
+    # Importing the package must not load driver dependencies, which is what
+    # keeps it fast
+    assert import_adi() == []
+
+
+def test_import_dir_complete():
+    names = dir(adi)
+    for name in ["ad9361", "Pluto", "QuadMxFE", "FMComms5", "tdd", "jesd"]:
+        assert name in names
+    assert set(adi.__all__) <= set(names)
+
+
+@pytest.mark.parametrize("name", ["ad9081", "adrv9009", "tdd"])
+def test_import_class_not_module(name):
+    # Submodule imports must not shadow the driver class of the same name
+    __import__(f"adi.{name}")
+    assert isinstance(getattr(adi, name), type)
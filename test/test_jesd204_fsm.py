@@ -0,0 +1,81 @@
+from test.stubs import device
+
+import pytest
+from adi import jesd204_fsm
+
+states = ["link_setup", "clocks_enable", "link_enable", jesd204_fsm.done_state]
+
+
+class fsm_device(device):
+    """Device whose JESD204 FSM pauses in every state until resumed"""
+
+    def __init__(self, uri, resumed=None, last=len(states) - 1):
+        device.__init__(self, uri, uri=uri)
+        self.index = 0
+        self.last = last
+        self.paused = 1
+        self.error = 0
+        self.resumed = [] if resumed is None else resumed
+
+    @property
+    def jesd204_fsm_error(self):
+        return self.error
+
+    @property
+    def jesd204_fsm_paused(self):
+        return self.paused
+
+    @property
+    def jesd204_fsm_state(self):
+        return states[self.index]
+
+    @property
+    def jesd204_fsm_resume(self):
+        return "0"
+
+    @jesd204_fsm_resume.setter
+    def jesd204_fsm_resume(self, value):
+        self.resumed.append(self.uri)
+        if self.index < self.last:
+            self.index += 1
+        self.paused = int(self.index < len(states) - 1)
+
+
+class stuck_device(fsm_device):
+    @property
+    def jesd204_fsm_paused(self):
+        return 0
+
+
+def test_sync_lockstep():
+    resumed = []
+    devs = [fsm_device(uri, resumed) for uri in ["ip:a", "ip:b", "ip:c"]]
+    timeline = {}
+    assert jesd204_fsm.sync(devs, timeline, timeout=5) == "done"
+    for dev in devs:
+        assert [e.state for e in timeline[dev.uri]] == states
+        assert timeline[dev.uri][-1].status == "done"
+    # The primary is resumed after the secondaries in every state
+    steps = [resumed[i : i + 3] for i in range(0, len(resumed), 3)]
+    assert len(steps) == len(states) - 1
+    for step in steps:
+        assert sorted(step[:2]) == ["ip:b", "ip:c"]
+        assert step[2] == "ip:a"
+
+
+def test_sync_error():
+    devs = [fsm_device("ip:a"), fsm_device("ip:b")]
+    devs[1].error = -5
+    assert jesd204_fsm.sync(devs, {}, timeout=5) == "error"
+
+
+def test_sync_out_of_lockstep():
+    devs = [fsm_device("ip:a"), fsm_device("ip:b", last=1)]
+    with pytest.raises(Exception, match="lockstep"):
+        jesd204_fsm.sync(devs, {}, timeout=5)
+
+
+def test_sync_timeout():
+    devs = [fsm_device("ip:a"), stuck_device("ip:b")]
+    with pytest.raises(Exception, match="timed out"):
+        jesd204_fsm.sync(devs, {}, timeout=0.2, poll_max=0.01)
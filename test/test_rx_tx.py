@@ -0,0 +1,148 @@
+from test.stubs import attrs, channel, data_format, device
+
+import numpy as np
+import pytest
+from adi.attribute import attribute
+from adi.rx_tx import (
+    _iq_components,
+    _scan_convert,
+    _scan_layout,
+    _scan_view,
+    rx,
+    tx,
+)
+
+
+def test_scan_layout_aligns_and_skips():
+    dev = device(
+        channels=[
+            channel("voltage1", 1, data_format(32, 32)),
+            channel("voltage0", 0, data_format(16, 12)),
+            channel("voltage2", 2, data_format(), enabled=False),
+            channel("altvoltage0", 3, data_format(), output=True),
+            channel("temp", 4, data_format(), scan=False),
+        ]
+    )
+    step, layout = _scan_layout(dev)
+    # 2 bytes of voltage0, padded to align the 4 byte voltage1
+    assert step == 8
+    assert [(k, v[0]) for k, v in layout.items()] == [("voltage0", 0), ("voltage1", 4)]
+
+
+def test_scan_layout_shared_index():
+    dev = device(
+        channels=[
+            channel("voltage0_i", 0, data_format()),
+            channel("voltage0_q", 0, data_format()),
+            channel("voltage1", 1, data_format()),
+        ]
+    )
+    step, layout = _scan_layout(dev)
+    assert step == 4
+    assert layout["voltage0_i"][0] == layout["voltage0_q"][0] == 0
+    assert layout["voltage1"][0] == 2
+
+
+def test_scan_convert_native_is_view():
+    df = data_format()
+    raw = np.arange(8, dtype=np.uint8)
+    view = _scan_view(raw, 0, 4, df)
+    assert _scan_convert(view, df) is view
+
+
+def test_scan_convert_shift_and_sign():
+    # 12 bit signed samples stored in the upper bits of big endian words
+    df = data_format(16, 12, shift=4, is_be=True)
+    samples = (np.array([-2048, -1, 0, 2047], dtype=np.int16) << 4).astype(">i2")
+    raw = np.frombuffer(samples.tobytes(), dtype=np.uint8).copy()
+    out = _scan_convert(_scan_view(raw, 0, 2, df), df)
+    assert out.dtype == np.int16
+    assert out.tolist() == [-2048, -1, 0, 2047]
+
+
+def test_scan_convert_unsigned_into_out():
+    df = data_format(16, 10, is_signed=False)
+    raw = np.frombuffer(np.array([0xFC01, 0x03FF], "<u2").tobytes(), np.uint8).copy()
+    out = np.zeros(2, dtype=np.uint16)
+    assert _scan_convert(_scan_view(raw, 0, 2, df), df, out) is out
+    assert out.tolist() == [1, 1023]
+
+
+class adc(rx):
+    _rx_channel_names = ["voltage0", "voltage1"]
+
+    def __init__(self, dev):
+        self._ctrl = self._rxadc = dev
+        rx.__init__(self)
+
+
+class adc_channel(attribute):
+    def __init__(self, ctrl, name):
+        self._ctrl = ctrl
+        self.name = name
+
+    @property
+    def scale(self):
+        return self._get_iio_attr(self.name, "scale", False)
+
+    @scale.setter
+    def scale(self, value):
+        self._set_iio_attr(self.name, "scale", False, value)
+
+
+def test_conversion_refreshed_by_channel_writes():
+    dev = device(
+        channels=[
+            channel(name, attrs=attrs({"scale": 0.5, "offset": 1, "label": "x"}))
+            for name in adc._rx_channel_names
+        ]
+    )
+    obj = adc(dev)
+    chan = adc_channel(dev, "voltage1")
+    scale, offset = obj._rx__rx_conversion_coefficients()
+    assert scale.tolist() == [0.5, 0.5]
+    assert offset.tolist() == [1, 1]
+
+    # Unrelated attributes keep the cached coefficients
+    chan._set_iio_attr("voltage1", "label", False, "y")
+    assert obj._rx__rx_conversion_coefficients()[0] is scale
+
+    chan.scale = 0.25
+    scale, _ = obj._rx__rx_conversion_coefficients()
+    assert scale.tolist() == [0.5, 0.25]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        np.array([1 + 2j, 3 + 4j]),
+        np.array([[1, 2], [3, 4]], dtype=np.int16),
+        np.array([(1, 2), (3, 4)], dtype=[("i", "i2"), ("q", "i2")]),
+        [1 + 2j, 3 + 4j],
+    ],
+)
+def test_iq_components(data):
+    i, q = _iq_components(data)
+    assert list(i) == [1, 3]
+    assert list(q) == [2, 4]
+
+
+@pytest.mark.parametrize(
+    "src, expected",
+    [
+        (np.array([1, -2], dtype=np.int16), [1, -2]),
+        (np.array([40000, -40000, 5], dtype=np.int32), [32767, -32768, 5]),
+        (np.array([1.4, 2.6, -1e9, 1e9]), [1, 3, -32768, 32767]),
+        (np.array([0.5, -2.5], dtype=np.float32), [0, -2]),
+    ],
+)
+def test_tx_saturate(src, expected):
+    dev = object.__new__(tx)
+    dst = np.zeros(len(src), dtype=np.int16)
+    dev._tx__tx_saturate(src, dst)
+    assert dst.tolist() == expected
+    # The scratch array is reused for sources of the same type and length
+    if np.issubdtype(src.dtype, np.floating):
+        scratch = dev._tx__tx_scratch[src.dtype]
+        dev._tx__tx_saturate(src, dst)
+        assert dev._tx__tx_scratch[src.dtype] is scratch
@@ -0,0 +1,56 @@
+from test.stubs import context
+
+import pytest
+from adi import topology
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(topology, "enabled", True)
+    yield tmp_path
+
+
+def test_topology_roundtrip(cache):
+    ctx = context(xml="<context/>")
+    topo = {"rx": ["voltage0", "voltage1"], "count": 2}
+    assert topology.load(ctx, "drv", 1) is None
+    topology.save(ctx, "drv", topo, 1)
+    assert topology.load(ctx, "drv", 1) == topo
+    # Different arguments, drivers and contexts are cached separately
+    assert topology.load(ctx, "drv", 2) is None
+    assert topology.load(ctx, "other", 1) is None
+    assert topology.load(context(xml="<other/>"), "drv", 1) is None
+
+
+def test_topology_key_from_attrs(cache):
+    ctx = context(hw_serial="1234", fw_version="v0.1")
+    topology.save(ctx, "drv", [1, 2])
+    assert topology.load(context(hw_serial="1234", fw_version="v0.1"), "drv") == [1, 2]
+    assert topology.load(context(hw_serial="5678", fw_version="v0.1"), "drv") is None
+
+
+def test_topology_invalidate(cache):
+    ctx = context(xml="<context/>")
+    topology.save(ctx, "drv", {"a": 1})
+    topology.invalidate()
+    assert topology.load(ctx, "drv") is None
+
+
+def test_topology_corrupt_and_unserializable(cache):
+    ctx = context(xml="<context/>")
+    topology.save(ctx, "drv", {"a": object()})
+    assert topology.load(ctx, "drv") is None
+    topology.save(ctx, "drv", {"a": 1})
+    path = topology._file(ctx, "drv", [])
+    with open(path, "w") as f:
+        f.write("{")
+    assert topology.load(ctx, "drv") is None
+
+
+def test_topology_disabled(cache, monkeypatch):
+    monkeypatch.setattr(topology, "enabled", False)
+    ctx = context(xml="<context/>")
+    topology.save(ctx, "drv", {"a": 1})
+    assert topology.load(ctx, "drv") is None
+    assert not (cache / "pyadi-iio" / "topology").exists()